@@ -1,4 +1,8 @@
-from .cnes_checker import register
-
 def register(linter):
-    cnes_checker.register(linter)
\ No newline at end of file
+    # imported here so that the client of the daemon does not import pylint
+    from . import cnes_checker
+    cnes_checker.register(linter)
+
+def load_configuration(linter):
+    from . import cnes_checker
+    cnes_checker.load_configuration(linter)
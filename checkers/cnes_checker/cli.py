@@ -0,0 +1,147 @@
+"""Command line entry point linting the files changed in a git repository
+
+::
+
+    cnes-lint --changed-since origin/master [pylint options]
+
+lints, with the CNES checkers loaded, the python files which changed since the
+given revision (committed or not, and the untracked ones) and the files of the
+repository which import them. The other arguments are given to pylint, which
+reads its configuration as usual. With `--watch <directory>` instead, the
+files of the directory are linted as they change (see `watch`). Without
+either, the files given to pylint are linted.
+
+With `-j`, the files are linted by the process pool of `pool`.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+from .pool import PoolRun
+
+
+def git(root, *args):
+    """Return the lines output by git command `args` run in `root`"""
+    output = subprocess.run(('git',) + args, cwd=root, capture_output=True,
+                            text=True, check=True).stdout
+    return [line for line in output.splitlines() if line]
+
+
+def repository_files(root):
+    """Return the python files of the repository, tracked or untracked"""
+    return [os.path.join(root, path) for path in
+            git(root, 'ls-files', '--cached', '--others', '--exclude-standard',
+                '--', '*.py')]
+
+
+def changed_files(root, revision):
+    """Return the python files which changed since `revision`, including the
+    deleted ones
+    """
+    paths = git(root, 'diff', '--name-only', revision, '--', '*.py')
+    paths += git(root, 'ls-files', '--others', '--exclude-standard', '--',
+                 '*.py')
+    return [os.path.join(root, path) for path in paths]
+
+
+def module_name(path):
+    """Return the dotted name of the module of file `path`, from the
+    outermost package containing it
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    parts = [] if filename == '__init__.py' else [filename[:-3]]
+    while os.path.isfile(os.path.join(directory, '__init__.py')):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return '.'.join(parts)
+
+
+def imported_names(source, path, name):
+    """Return the names of the modules `source`, of file `path` and module
+    `name`, may import, along with their parent packages
+    """
+    try:
+        tree = ast.parse(source, path)
+    except (SyntaxError, ValueError):
+        return set()
+    package = name if path.endswith('__init__.py') else name.rpartition('.')[0]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                parent = package.split('.') if package else []
+                parent = parent[:len(parent) - node.level + 1]
+                base = '.'.join(parent + ([base] if base else []))
+            names.add(base)
+            names.update(f'{base}.{alias.name}' for alias in node.names)
+    # importing a module imports its packages
+    for imported in list(names):
+        while '.' in imported:
+            imported = imported.rpartition('.')[0]
+            names.add(imported)
+    return names
+
+
+def affected_files(root, revision):
+    """Return the existing python files changed since `revision` and those
+    importing them
+    """
+    changed = changed_files(root, revision)
+    changed_modules = {module_name(path) for path in changed}
+    # an importer names the module, unless importing it relatively
+    markers = {name.rpartition('.')[2].encode() for name in changed_modules}
+    markers.add(b'from .')
+    affected = {path for path in changed if os.path.isfile(path)}
+    for path in repository_files(root):
+        if path in affected:
+            continue
+        try:
+            with open(path, 'rb') as stream:
+                source = stream.read()
+        except OSError:
+            continue
+        if any(marker in source for marker in markers) and changed_modules \
+                & imported_names(source, path, module_name(path)):
+            affected.add(path)
+    return sorted(affected)
+
+
+def main(argv=None):
+    """Lint the given python files, or those affected by changes"""
+    parser = argparse.ArgumentParser(
+        prog='cnes-lint', description=__doc__.split('\n', 1)[0],
+        epilog='The other arguments are pylint options.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--changed-since', metavar='<revision>',
+                      help='lint the python files changed since this git '
+                           'revision and the files importing them')
+    mode.add_argument('--watch', metavar='<directory>',
+                      help='lint the python files of this directory, then '
+                           'the changed ones and the files importing them '
+                           'whenever files change')
+    args, pylint_args = parser.parse_known_args(argv)
+    if args.watch:
+        # the watch mode reuses the functions of this module
+        from .watch import watch
+        return watch(args.watch, pylint_args)
+    files = []
+    if args.changed_since:
+        try:
+            root = git(os.getcwd(), 'rev-parse', '--show-toplevel')[0]
+            files = affected_files(root, args.changed_since)
+        except subprocess.CalledProcessError as exc:
+            parser.exit(2, exc.stderr)
+        if not files:
+            return 0
+    run = PoolRun(['--load-plugins=cnes_checker'] + pylint_args + files,
+                  exit=False)
+    return run.linter.msg_status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
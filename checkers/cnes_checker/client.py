@@ -0,0 +1,70 @@
+"""Client of the lint daemon
+
+::
+
+    cnes-lintc [pylint options] files...
+
+sends its arguments and working directory to the daemon started by
+`cnes-lintd`, listening on `$CNES_LINTD_SOCKET` or on its default socket, and
+outputs its answer. When no daemon listens, pylint is run in process. Only
+the standard library is imported otherwise, to start quickly.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+
+PYLINT_ARGS = ['--load-plugins=cnes_checker']
+
+
+def default_socket():
+    """Return the path of the socket of the daemon of the current user"""
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(directory, f'cnes-lintd-{os.getuid()}.sock')
+
+
+def listening(path):
+    """Return True if a daemon listens on `path`"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def request(path, args, cwd):
+    """Send a lint request to the daemon listening on `path`; return its
+    answer, or None if no daemon listens
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(json.dumps({'args': list(args),
+                                       'cwd': cwd}).encode() + b'\n')
+            with client.makefile('rb') as stream:
+                answer = stream.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(answer)
+    except ValueError:
+        return None
+
+
+def main(argv=None):
+    """Lint through the daemon, or in process if none listens"""
+    argv = sys.argv[1:] if argv is None else argv
+    path = os.environ.get('CNES_LINTD_SOCKET') or default_socket()
+    answer = request(path, argv, os.getcwd())
+    if answer is None:
+        from pylint.lint import Run
+        return Run(PYLINT_ARGS + argv, exit=False).linter.msg_status
+    sys.stdout.write(answer['stdout'])
+    sys.stderr.write(answer['stderr'])
+    return answer['status']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
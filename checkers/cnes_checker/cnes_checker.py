@@ -15,21 +15,377 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 """CNES checker for Python code"""
 
-from collections import defaultdict
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+import functools
+import json
 import re
 import os
+import time
 
 import astroid
-from astroid.exceptions import InferenceError
+from astroid.exceptions import InferenceError, NoDefault
 from pylint.extensions import docparams
 from pylint.checkers import BaseChecker, BaseTokenChecker
 from pylint.checkers import utils
-from pylint.checkers.raw_metrics import get_type
+from pylint.checkers.raw_metrics import JUNK
 from pylint.constants import WarningScope
 import tokenize
 
+from .result_cache import (CachedResultsMixin, ResultCache,
+                           ResultCacheChecker)
+from . import pool, snapshots
+from .profiling import ProfileChecker, ProfiledCallbacksMixin, Profiler
 
-class DesignChecker(BaseChecker):
+
+class InferenceBudgetExceeded(InferenceError):
+    """Raised instead of the values of a node whose inference exceeded the
+    budget
+    """
+
+
+class InferenceCache(object):
+    """Values inferred for the nodes of the module being checked
+
+    The cache is shared by the CNES checkers, so that a node inferred by one of
+    them is not inferred again by another. Failures are cached as well and
+    raised again on later lookups. Each checker using the cache calls
+    `enter_module` and `leave_module`; the values are dropped when the last of
+    them leaves the module. `hits` and `misses` count lookups over the run.
+
+    The inferences are bounded by the budget of the options of `checker`:
+    a node with too many values, or whose values took too long to infer,
+    raises InferenceBudgetExceeded, as do all the nodes of a module once the
+    inferences of the module took too long. `checker` reports each excess
+    with `inference-budget-exceeded`, and `exceeded` counts them.
+    """
+
+    def __init__(self):
+        self.checker = None
+        self.hits = 0
+        self.misses = 0
+        self.exceeded = 0
+        self._max_values = self._max_time = self._max_module_time = 0
+        self._values = {}
+        self._module = None
+        self._users = 0
+        self._module_time = 0.0
+        self._exhausted = False
+
+    def report_to(self, checker):
+        """Make `checker` report the excesses of the budget of its options,
+        unless another checker already does
+        """
+        if self.checker is None:
+            self.checker = checker
+
+    def enter_module(self, node):
+        """Register a checker starting the check of module `node`"""
+        if node is not self._module:
+            self.clear()
+            self._module = node
+            config = self.checker.linter.config if self.checker else None
+            self._max_values = getattr(config, 'max_inferred_values', 0)
+            self._max_time = getattr(config, 'max_inference_time', 0)
+            self._max_module_time = getattr(config,
+                                            'max_module_inference_time', 0)
+        self._users += 1
+
+    def leave_module(self, _node):
+        """Register a checker done with the current module"""
+        self._users -= 1
+        if self._users <= 0:
+            self.clear()
+
+    def clear(self):
+        """Drop the cached values"""
+        self._values = {}
+        self._module = None
+        self._users = 0
+        self._module_time = 0.0
+        self._exhausted = False
+
+    def infer(self, node):
+        """Iterate over the values inferred for `node`, like `node.infer()`"""
+        try:
+            _, values, error = self._values[id(node)]
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            values, error = self._infer(node)
+            self._values[id(node)] = (node, values, error)
+        yield from values
+        if error is not None:
+            raise error
+
+    def _infer(self, node):
+        """Return the values inferred for `node` within the budget, and the
+        exception ending the inference if any
+        """
+        if self._exhausted:
+            return [], InferenceBudgetExceeded('module inference budget '
+                                               'exceeded')
+        values = []
+        start = time.perf_counter()
+        try:
+            for value in node.infer():
+                values.append(value)
+                if self._max_values and len(values) > self._max_values:
+                    return [], self._exceed(
+                        node, f'more than {self._max_values} values inferred '
+                              f'for {type(node).__name__}')
+                # checked between values, one cannot be interrupted
+                if self._max_time \
+                        and time.perf_counter() - start > self._max_time:
+                    return [], self._exceed(
+                        node, f'inference of {type(node).__name__} took more '
+                              f'than {self._max_time}s')
+        except Exception as exc:  # pylint: disable=broad-except
+            return values, exc
+        finally:
+            self._module_time += time.perf_counter() - start
+            if self._max_module_time and not self._exhausted \
+                    and self._module_time > self._max_module_time:
+                self._exhausted = True
+                self._exceed(self._module, f'inferences of the module took '
+                                           f'more than '
+                                           f'{self._max_module_time}s, the '
+                                           f'next ones are skipped')
+        return values, None
+
+    def _exceed(self, node, reason):
+        self.exceeded += 1
+        if self.checker is not None:
+            self.checker.add_message('inference-budget-exceeded', node=node,
+                                     args=reason)
+        return InferenceBudgetExceeded(reason)
+
+
+class MetricsExport(object):
+    """Per-function metrics appended to the `metrics-file` as JSON lines
+
+    The checkers computing the metrics share the export: each of them calls
+    `enter_module` and `leave_module`, and the records of a module are written
+    when the last of them leaves it, so that a single line gathers all the
+    metrics of a function and only one module is held in memory.
+    """
+
+    FIELDS = ('mccabe', 'simplified_mccabe', 'comment_ratio')
+
+    def __init__(self, linter):
+        self.linter = linter
+        self._records = {}
+        self._module = None
+        self._users = 0
+
+    @property
+    def path(self):
+        """Path of the metrics file, empty when the export is disabled"""
+        return getattr(self.linter.config, 'metrics_file', '')
+
+    def enter_module(self, node):
+        """Register a checker starting the check of module `node`"""
+        if node is not self._module:
+            # the check of the previous module may have been interrupted
+            self.write()
+            self._module = node
+        self._users += 1
+
+    def leave_module(self, _node):
+        """Register a checker done with the current module"""
+        self._users -= 1
+        if self._users <= 0:
+            self.write()
+
+    def write(self):
+        """Write the records of the current module"""
+        self._module = None
+        self._users = 0
+        records, self._records = self._records, {}
+        if records and self.path:
+            with open(self.path, 'a', encoding='utf-8') as stream:
+                for record in records.values():
+                    stream.write(json.dumps(record) + '\n')
+
+    def record(self, node, **metrics):
+        """Set metrics of function `node`"""
+        record = self._records.get(node)
+        if record is None:
+            module = node.root()
+            record = {'path': module.file, 'module': module.name,
+                      'function': node.qname(), 'line': node.fromlineno}
+            record.update(dict.fromkeys(self.FIELDS))
+            self._records[node] = record
+        record.update(metrics)
+
+
+class CallGraph(object):
+    """Caller/callee index of the functions of a module
+
+    Calls are recorded while pylint walks the module, then resolved once by
+    `resolve`, only inferring the callees which may refer to a function of
+    the module, through the given `InferenceCache`.
+    """
+
+    def __init__(self, inference_cache):
+        self._inference_cache = inference_cache
+        self._order = {}
+        self._names = set()
+        self._counter = 0
+        self._pending = []
+        self._callees = defaultdict(dict)
+        self._callers = defaultdict(dict)
+
+    def add_function(self, node):
+        """Register function `node`, entered by the module walk"""
+        self._order[node] = [self._counter, None]
+        self._counter += 1
+        self._names.add(node.name)
+
+    def leave_function(self, node):
+        """Register the end of the walk of function `node`"""
+        self._order[node][1] = self._counter
+        self._counter += 1
+
+    def add_call(self, caller, call):
+        """Record call node `call` made from the body of function `caller`"""
+        self._pending.append((caller, call))
+
+    def resolve(self):
+        """Turn the recorded calls into edges between functions"""
+        for caller, call in self._pending:
+            if not self._may_call_function(call.func):
+                continue
+            for callee in self.infer_callees(call):
+                if callee in self._order:
+                    self._callees[caller].setdefault(callee, []).append(call)
+                    self._callers[callee].setdefault(caller, []).append(call)
+        self._pending = []
+
+    def infer_callees(self, call):
+        """Return the distinct values inferred for the callee of `call`"""
+        callees = []
+        try:
+            for funcdef in self._inference_cache.infer(call.func):
+                if not any(funcdef is callee for callee in callees):
+                    callees.append(funcdef)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return callees
+
+    def _may_call_function(self, func):
+        """Return True if `func` may infer to a function of the module
+
+        Callees named after a function are candidates, as well as names bound
+        to anything but a plain definition or import (aliases, parameters...)
+        and callees which are neither names nor attributes.
+        """
+        if isinstance(func, astroid.Attribute):
+            return func.attrname in self._names
+        if not isinstance(func, astroid.Name):
+            return True
+        if func.name in self._names:
+            return True
+        _, assignments = func.lookup(func.name)
+        return not all(isinstance(assignment, (astroid.FunctionDef,
+                                               astroid.ClassDef,
+                                               astroid.Import,
+                                               astroid.ImportFrom))
+                       for assignment in assignments)
+
+    def callees(self, function):
+        """Return the functions called from `function`"""
+        return list(self._callees.get(function, ()))
+
+    def callers(self, function):
+        """Return the functions calling `function`"""
+        return list(self._callers.get(function, ()))
+
+    def calls(self, caller, callee):
+        """Return the call nodes from `caller` to `callee`"""
+        return list(self._callees.get(caller, {}).get(callee, ()))
+
+    def encloses(self, outer, inner):
+        """Return True if function `inner` is `outer` or is nested in it"""
+        outer_start, outer_end = self._order[outer]
+        inner_start, inner_end = self._order[inner]
+        return outer_start <= inner_start and inner_end <= outer_end
+
+    def strongly_connected_components(self):
+        """Return the strongly connected components of the graph
+
+        Iterative version of Tarjan's algorithm, linear in the number of
+        functions and edges.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self._order:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.callees(root)))]
+            while work:
+                function, callees = work[-1]
+                for callee in callees:
+                    if callee not in index:
+                        index[callee] = lowlink[callee] = len(index)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(self.callees(callee))))
+                        break
+                    if callee in on_stack:
+                        lowlink[function] = min(lowlink[function],
+                                                index[callee])
+                else:
+                    work.pop()
+                    if work:
+                        caller = work[-1][0]
+                        lowlink[caller] = min(lowlink[caller],
+                                              lowlink[function])
+                    if lowlink[function] == index[function]:
+                        component = []
+                        member = None
+                        while member is not function:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                        components.append(component)
+        return components
+
+    def recursive_calls(self):
+        """Yield the call nodes involved in a direct or indirect recursion
+
+        A call is directly recursive when its callee is the function it is
+        made from or one of the functions enclosing it. It is indirectly
+        recursive when caller and callee belong to the same cycle. A call
+        with several recursive callees is yielded once.
+        """
+        seen = set()
+        cycles = {}
+        for number, component in enumerate(
+                self.strongly_connected_components()):
+            if len(component) > 1:
+                for function in component:
+                    cycles[function] = number
+        for caller, callees in self._callees.items():
+            for callee, calls in callees.items():
+                if (self.encloses(callee, caller)
+                        or (caller in cycles
+                            and cycles.get(callee) == cycles[caller])):
+                    for call in calls:
+                        if id(call) not in seen:
+                            seen.add(id(call))
+                            yield call
+
+
+class DesignChecker(ProfiledCallbacksMixin, CachedResultsMixin,
+                    BaseChecker):
     """Checks for multiple exit statements in loops"""
 
     name = 'design'
@@ -51,14 +407,21 @@ class DesignChecker(BaseChecker):
                       'built-in. This makes the code more difficult to read.'),
             'R5105': ('Consider not using recursion',
                       'recursive-call',
-                      'Used when direct recursion is used in a function or a'
-                      'method. It can lead to a dangerous behaviour if the'
-                      'depth is not known.'),
+                      'Used when direct or indirect recursion is used in a '
+                      'function or a method. It can lead to a dangerous '
+                      'behaviour if the depth is not known.'),
             'R5106': ('Consider %s within a context manager',
                       'use-context-manager',
                       'Used when a file is opened or a lock is acquired without'
                       'context manager. This is error-prone because one can'
                       'forget closing or releasing it.'),
+            'I5107': ('Inference budget exceeded: %s',
+                      'inference-budget-exceeded',
+                      'Used when the inference of a node, or the inferences '
+                      'of a module, by the CNES checkers exceeded the '
+                      'max-inferred-values, max-inference-time or '
+                      'max-module-inference-time option. The checks needing '
+                      'those inferences are skipped.'),
            }
 
     options = (('max-decorators',
@@ -66,20 +429,64 @@ class DesignChecker(BaseChecker):
                  'type': 'int', 'metavar': '<num>',
                  'help': 'Maximum number of decorators allowed per function.'}
                ),
+               ('max-inferred-values',
+                {'default': 100,
+                 'type': 'int', 'metavar': '<num>',
+                 'help': 'Maximum number of values inferred for a node by '
+                         'the CNES checkers. Unbounded when 0.'}
+               ),
+               ('max-inference-time',
+                {'default': 2.0,
+                 'type': 'float', 'metavar': '<seconds>',
+                 'help': 'Maximum time spent inferring the values of a node '
+                         'for the CNES checkers, checked after each value. '
+                         'Unbounded when 0.'}
+               ),
+               ('max-module-inference-time',
+                {'default': 60.0,
+                 'type': 'float', 'metavar': '<seconds>',
+                 'help': 'Maximum time spent inferring the nodes of a module '
+                         'for the CNES checkers, after which the checks '
+                         'needing inferences are skipped. Unbounded when 0.'}
+               ),
               )
 
-    def __init__(self, linter=None):
+    def __init__(self, linter=None, inference_cache=None):
         BaseChecker.__init__(self, linter)
-        self.config = linter.config
+        if inference_cache is None:
+            inference_cache = InferenceCache()
+        # the messages of the budget, shared by the checkers, are ours
+        inference_cache.report_to(self)
+        self.inference_cache = inference_cache
         self._exit_statements = []
+        self._functions = []
+        self.call_graph = CallGraph(self.inference_cache)
 
-    def visit_for(self, node):
+    def visit_module(self, node):
+        self.inference_cache.enter_module(node)
+        self._exit_statements = []
+        self._functions = []
+        self.call_graph = CallGraph(self.inference_cache)
+
+    def leave_module(self, node):
+        if self.linter.is_message_enabled('recursive-call'):
+            self.call_graph.resolve()
+            # in the order of the source, as the other messages
+            for call in sorted(self.call_graph.recursive_calls(),
+                               key=lambda call: (call.fromlineno,
+                                                 call.col_offset)):
+                self.add_message('recursive-call', node=call)
+        self.inference_cache.leave_module(node)
+
+    def visit_for(self, _node):
         self._exit_statements.append(0)
 
     @utils.only_required_for_messages('use-context-manager')
     def visit_attribute(self, node):
+        if node.attrname != 'acquire':
+            return
         try:
-            for infer in node.infer():
+            for infer in self.inference_cache.infer(node):
                 if (not isinstance(infer, astroid.BoundMethod)
                         or infer.name != 'acquire'):
                     continue
@@ -92,10 +499,14 @@ class DesignChecker(BaseChecker):
         except InferenceError:
             pass
 
-    @utils.only_required_for_messages('use-context-manager')
+    @utils.only_required_for_messages('use-context-manager', 'recursive-call')
     def visit_call(self, node):
+        if self._functions:
+            self.call_graph.add_call(self._functions[-1], node)
+        if not self._may_call_open(node.func):
+            return
         try:
-            for funcdef in node.func.infer():
+            for funcdef in self.inference_cache.infer(node.func):
                 if funcdef.name == 'open':
                     parent = funcdef.parent
                     if (isinstance(parent, astroid.Module)
@@ -106,9 +517,38 @@ class DesignChecker(BaseChecker):
         except InferenceError:
             pass
 
-    @utils.only_required_for_messages('bad-exit-condition')
+    @staticmethod
+    def _may_call_open(func):
+        """Return True if `func` may infer to the builtin `open` function
+
+        That is the case of `open` names and attributes, of names which may
+        be bound to `open` by an import alias (`from io import open as
+        fopen`), and of names bound to anything but a plain definition or
+        import (assignments, parameters...).
+        """
+        if isinstance(func, astroid.Attribute):
+            return func.attrname == 'open'
+        if not isinstance(func, astroid.Name):
+            return True
+        if func.name == 'open':
+            return True
+        _, assignments = func.lookup(func.name)
+        for assignment in assignments:
+            if isinstance(assignment, astroid.ImportFrom):
+                if any(name == 'open' and alias == func.name
+                       for name, alias in assignment.names):
+                    return True
+            elif not isinstance(assignment, (astroid.FunctionDef,
+                                             astroid.ClassDef,
+                                             astroid.Import)):
+                return True
+        return False
+
     def visit_while(self, node):
+        # pushed whatever the messages, as leave_while pops
         self._exit_statements.append(0)
+        if not self.linter.is_message_enabled('bad-exit-condition'):
+            return
         comparisons = None
         if isinstance(node.test, astroid.Compare):
             comparisons = [node.test]
@@ -128,29 +568,27 @@ class DesignChecker(BaseChecker):
             self.add_message('multiple-exit-statements', node=node)
         self._exit_statements.pop()
 
-    def visit_return(self, node):
+    def visit_return(self, _node):
         if self._exit_statements:
             self._exit_statements[-1] += 1
 
     visit_break = visit_return
     leave_while = leave_for
 
-    @utils.only_required_for_messages('too-many-decorators')
     def visit_functiondef(self, node):
-        max_decorators = getattr(self.config, 'max_decorators', self.options[0][1]['default'])
+        self._functions.append(node)
+        self.call_graph.add_function(node)
+        max_decorators = getattr(self.linter.config, 'max_decorators',
+                                 self.options[0][1]['default'])
         if node.decorators:
             if len(node.decorators.nodes) > max_decorators:
                 self.add_message('too-many-decorators', node=node,
                                  args=(len(node.decorators.nodes),
                                        max_decorators))
-        for child in node.nodes_of_class(astroid.Call):
-            try:
-                for funcdef in child.func.infer():
-                    if funcdef == node:
-                        self.add_message('recursive-call', node=child)
-                        break
-            except:
-                continue
+
+    def leave_functiondef(self, node):
+        self._functions.pop()
+        self.call_graph.leave_function(node)
 
     @utils.only_required_for_messages('builtin-name-used')
     def visit_classdef(self, node):
@@ -176,7 +614,84 @@ class DesignChecker(BaseChecker):
         self.add_message('builtin-name-used', node=item, args=(name,))
 
 
-class CommentMetricsChecker(BaseTokenChecker):
+class LineTypeRuns(object):
+    """Runs of lines of the same type in a module, as computed from its tokens
+
+    Runs are stored in arrays sorted by first line. Once `freeze` is called,
+    prefix sums of the run lengths per line type allow to count the lines of
+    each type in a range with a few binary searches.
+    """
+
+    def __init__(self, line_types):
+        self._line_types = line_types
+        self._starts = array('l')
+        self._lengths = array('l')
+        self._types = array('b')
+        self._ends = None
+        self._max_ends = None
+        self._prefix = None
+
+    def append(self, start, length, line_type):
+        """Add `length` lines of type `line_type` starting at line `start`
+
+        The lines are merged into the last run if it has the same type.
+        """
+        type_index = self._line_types.index(line_type)
+        if self._types and self._types[-1] == type_index:
+            self._lengths[-1] += length
+        else:
+            self._starts.append(start)
+            self._lengths.append(length)
+            self._types.append(type_index)
+        self._ends = None
+
+    def freeze(self):
+        """Compute the run ends and the prefix sums of the run lengths"""
+        self._ends = array('l')
+        self._max_ends = array('l')
+        self._prefix = [array('l', [0]) for _ in self._line_types]
+        max_end = 0
+        for start, length, type_index in zip(self._starts, self._lengths,
+                                             self._types):
+            # merged runs may overlap the next ones: keep the running maximum
+            # of the ends to bound the runs reaching a given line
+            end = start + length - 1
+            max_end = max(max_end, end)
+            self._ends.append(end)
+            self._max_ends.append(max_end)
+            for index, prefix in enumerate(self._prefix):
+                if index == type_index:
+                    prefix.append(prefix[-1] + length)
+                else:
+                    prefix.append(prefix[-1])
+
+    def count(self, first, last):
+        """Return the number of lines of each type from line `first` to `last`
+        """
+        if self._ends is None:
+            self.freeze()
+        inside = bisect_left(self._starts, first)
+        after = bisect_right(self._starts, last)
+        counts = {}
+        for index, line_type in enumerate(self._line_types):
+            prefix = self._prefix[index]
+            counts[line_type] = prefix[after] - prefix[min(inside, after)]
+        # runs starting before the range and reaching it
+        for run in range(bisect_left(self._max_ends, first), inside):
+            if self._ends[run] >= first:
+                line_type = self._line_types[self._types[run]]
+                counts[line_type] += min(last, self._ends[run]) - first + 1
+        # runs starting in the range and going beyond it
+        for run in range(max(bisect_right(self._max_ends, last), inside),
+                         after):
+            if self._ends[run] > last:
+                line_type = self._line_types[self._types[run]]
+                counts[line_type] -= self._ends[run] - last
+        return counts
+
+
+class CommentMetricsChecker(ProfiledCallbacksMixin, CachedResultsMixin,
+                            BaseTokenChecker):
     """Checks the ratio comments+docstrings/code lines by module and by function
     """
     
@@ -211,60 +726,89 @@ class CommentMetricsChecker(BaseTokenChecker):
                          'the comments ratio will be checked.'}),
               )
 
-    def __init__(self, linter):
+    def __init__(self, linter, metrics_export=None):
         BaseTokenChecker.__init__(self, linter)
-        self.config = linter.config
+        self.metrics_export = metrics_export or MetricsExport(linter)
         self._reset()
 
     def _reset(self):
-        self._stats = {}
+        self._runs = LineTypeRuns(self.LINE_TYPES)
         self._global_stats = dict.fromkeys(self.LINE_TYPES, 0)
 
     def process_tokens(self, tokens):
         """update stats"""
-        i = 0
-        tokens = list(tokens)
-        if tokens[0].type == tokenize.ENCODING:
-            i = 1
-        tail = None
-        while i < len(tokens):
-            start_line = tokens[i][2][0]
-            i, lines_number, line_type = get_type(tokens, i)
+        self._reset()
+        for start_line, lines_number, line_type in self._iter_lines(tokens):
             self._global_stats[line_type] += lines_number
-            if tail and self._stats[tail][0] == line_type:
-                self._stats[tail][1] += lines_number
-            else:
-                self._stats[start_line] = [line_type, lines_number]
-                tail = start_line
+            self._runs.append(start_line, lines_number, line_type)
+        self._runs.freeze()
+
+    def _iter_lines(self, tokens):
+        """Classify the lines of the module from its tokens, in a single pass
+
+        Yield (first line, number of lines, line type) for each group of
+        tokens starting on the same line. The classification is the one of
+        pylint's `raw_metrics.get_type`, without requiring a list of tokens.
+        """
+        start = end = line_type = None
+        for index, token in enumerate(tokens):
+            if index == 0 and token.type == tokenize.ENCODING:
+                continue
+            if start is not None:
+                if token.start[0] == start:
+                    end = token.end[0]
+                    if line_type is None:
+                        line_type = self._token_line_type(token)
+                    continue
+                yield start, end - start + 1, line_type or self.LINE_TYPE_EMPTY
+                start = None
+                if line_type is not None and token.type == tokenize.NEWLINE:
+                    # the end of a logical line belongs to the previous group
+                    continue
+            start, end = token.start[0], token.end[0]
+            line_type = self._token_line_type(token)
+        if start is not None:
+            yield start, end - start + 1, line_type or self.LINE_TYPE_EMPTY
+
+    def _token_line_type(self, token):
+        """Return the type of a line starting with `token`, None if unknown"""
+        if token.type == tokenize.STRING:
+            return self.LINE_TYPE_DOCSTRING
+        if token.type == tokenize.COMMENT:
+            return self.LINE_TYPE_COMMENT
+        if token.type in JUNK:
+            return None
+        return self.LINE_TYPE_CODE
 
-    @utils.only_required_for_messages('too-few-comments')
     def visit_functiondef(self, node):
-        min_func_comments_ratio = getattr(self.config, 'min_func_comments_ratio', self.options[0][1]['default'])
-        min_func_size_to_check_comments = getattr(self.config, 'min_func_size_to_check_comments', self.options[2][1]['default'])
+        export = bool(self.metrics_export.path)
+        if not export and not self.linter.is_message_enabled('too-few-comments'):
+            return
+        min_func_comments_ratio = getattr(self.linter.config, 'min_func_comments_ratio', self.options[0][1]['default'])
+        min_func_size_to_check_comments = getattr(self.linter.config, 'min_func_size_to_check_comments', self.options[2][1]['default'])
         nb_lines = node.tolineno - node.fromlineno
-        if nb_lines <= min_func_size_to_check_comments:
+        if nb_lines <= min_func_size_to_check_comments and not export:
             return
-        func_stats = dict.fromkeys(self.LINE_TYPES, 0)
-        for line in sorted(self._stats):
-            if line > node.tolineno:
-                break
-            lines_number = self._stats[line][1]
-            if line + lines_number - 1 >= node.fromlineno:
-                l_type = self._stats[line][0]
-                func_stats[l_type] += (min(node.tolineno,
-                                           line + lines_number - 1)
-                                       - max(node.fromlineno, line) + 1)
+        func_stats = self._runs.count(node.fromlineno, node.tolineno)
         if func_stats[self.LINE_TYPE_CODE] <= 0:
             return
         ratio = ((func_stats[self.LINE_TYPE_COMMENT] + func_stats[self.LINE_TYPE_DOCSTRING])
                  / float(func_stats[self.LINE_TYPE_CODE]) * 100)
+        if export:
+            self.metrics_export.record(node, comment_ratio=round(ratio, 2))
+        if nb_lines <= min_func_size_to_check_comments:
+            return
         if ratio < min_func_comments_ratio:
             self.add_message('too-few-comments', node=node,
                             args=(f'{ratio:.2f}', min_func_comments_ratio))
 
-    @utils.only_required_for_messages('too-few-comments')
     def visit_module(self, node):
-        min_module_comments_ratio = getattr(self.config, 'min_module_comments_ratio', self.options[1][1]['default'])
+        self.metrics_export.enter_module(node)
+        if self.linter.is_message_enabled('too-few-comments'):
+            self._check_module_ratio(node)
+
+    def _check_module_ratio(self, node):
+        min_module_comments_ratio = getattr(self.linter.config, 'min_module_comments_ratio', self.options[1][1]['default'])
         if self._global_stats[self.LINE_TYPE_CODE] <= 0:
             return
         ratio = ((self._global_stats[self.LINE_TYPE_COMMENT] +
@@ -274,9 +818,9 @@ class CommentMetricsChecker(BaseTokenChecker):
             self.add_message('too-few-comments', node=node,
                              args=(f'{ratio:.2f}', min_module_comments_ratio))
 
-
     def leave_module(self, node):
         self._reset()
+        self.metrics_export.leave_module(node)
 
 
 class PathGraph(object):
@@ -298,79 +842,166 @@ class PathGraph(object):
         num_nodes = len(self.nodes)
         return num_edges - num_nodes + 2
 
+    def to_dot(self, name):
+        """Return the graph in DOT format"""
+        ids = {}
+        lines = [f'digraph "{name}" {{']
+        for node in self.nodes:
+            ids[node] = len(ids)
+            if isinstance(node, str):
+                label = ''
+            else:
+                label = f'{node.__class__.__name__} {node.lineno}'
+            lines.append(f'    {ids[node]} [label="{label}"];')
+        for node, destinations in self.nodes.items():
+            for destination in destinations:
+                lines.append(f'    {ids[node]} -> {ids[destination]};')
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
 
-class McCabeASTVisitor(object):
-    """Make a depth-first visit of a code node and build a graph accordingly
+class PathCounter(object):
+    """Count the edges and nodes of a McCabe graph without keeping them
 
-    Comes from mccabe module (see https://pypi.python.org/pypi/mccabe)
+    Relies on the way McCabeGraphBuilder connects nodes: apart from the root,
+    a node is the destination of a single connection, except for the bottoms
+    joining loose ends, whose connections are consecutive.
     """
+    def __init__(self, node):
+        self.root = node
+        self.num_edges = 0
+        self.num_nodes = 0
+        self._root_connected = False
+        self._last = None
 
-    def __init__(self):
-        self.node = None
-        self._cache = {}
+    def connect(self, n1, n2):
+        self.num_edges += 1
+        if n1 is self.root and not self._root_connected:
+            self._root_connected = True
+            self.num_nodes += 1
+        if n2 is not self._last:
+            self._last = n2
+            self.num_nodes += 1
+
+    def complexity(self):
+        """ Return the McCabe complexity for the graph V-E+2
+        """
+        return self.num_edges - self.num_nodes + 2
+
+
+class McCabeGraphBuilder(object):
+    """Build the McCabe graphs of a module from the events of the AST walk
+
+    Comes from mccabe module (see https://pypi.python.org/pypi/mccabe): only
+    the statements reached through the bodies of functions, classes and `with`
+    blocks and through the branches of `if`, loops and `try` statements are
+    part of the graphs. `visit` and `leave` must be called for the module and
+    for those nodes, in the order of a depth-first walk.
+
+    The graphs are instances of `graph_class`, PathCounter being enough to
+    compute their complexity.
+    """
+
+    def __init__(self, graph_class=PathCounter):
+        self._graph_class = graph_class
+        self._visitors = {}
         self.classname = ""
         self.graphs = {}
-        self.reset()
+        self._frames = []
+        self.graph = None
+        self.tail = None
         self._bottom_counter = 0
 
-    def default(self, node, *args):
-        pass
-
     def reset(self):
         self.graph = None
         self.tail = None
 
-    def dispatch(self, node, *args):
-        self.node = node
+    def visit(self, node):
+        """Enter `node` if it is part of the graphs
+
+        The transitions to the `else` and `finally` blocks are detected from
+        the position of `node`: the first statements of those blocks may be
+        of a kind which is not part of the graphs, hence not visited.
+        """
+        frames = self._frames
+        if not frames:
+            if isinstance(node, astroid.Module):
+                frames.append(_McCabeFrame(node))
+            return
+        frame = frames[-1]
+        if node.parent is not frame.node or not node.is_statement:
+            return
+        if frame.orelse_start is not None or frame.finalbody_start is not None:
+            position = (node.lineno, node.col_offset)
+            if frame.orelse_start is not None \
+                    and position >= frame.orelse_start:
+                self._enter_orelse(frame)
+            if frame.finalbody_start is not None \
+                    and position >= frame.finalbody_start:
+                frame.ignored = True
+        if frame.ignored:
+            return
         klass = node.__class__
-        meth = self._cache.get(klass)
+        meth = self._visitors.get(klass)
         if meth is None:
-            className = klass.__name__
-            meth = getattr(self.visitor, 'visit' + className, self.default)
-            self._cache[klass] = meth
-        return meth(node, *args)
-
-    def dispatch_list(self, node_list):
-        for node in node_list:
-            self.dispatch(node)
+            meth = self._visitors[klass] = \
+                getattr(self, 'visit' + klass.__name__, False)
+        if meth:
+            meth(node)
+
+    def leave(self, node):
+        """Leave `node`, completing its graph if it has one"""
+        if not self._frames or self._frames[-1].node is not node:
+            return
+        frame = self._frames.pop()
+        meth = getattr(self, 'leave' + node.__class__.__name__, None)
+        if meth is not None:
+            meth(node, frame)
 
-    def preorder(self, tree, visitor, *args):
-        """Do preorder walk of tree using visitor"""
-        self.visitor = visitor
-        visitor.visit = self.dispatch
-        self.dispatch(tree, *args)
+    def _enter_orelse(self, frame):
+        """Start the `else` block of the statement of `frame`"""
+        frame.loose_ends.append(self.tail)
+        self.tail = frame.node
+        frame.orelse_start = None
 
     def visitFunctionDef(self, node):
+        frame = _McCabeFrame(node)
         if self.graph is not None:
             # closure
+            frame.closure = True
             pathnode = self._append_node(node)
             self.tail = pathnode
-            self.dispatch_list(node.body)
+        else:
+            self.graph = self._graph_class(node)
+            self.tail = node
+        self._frames.append(frame)
+
+    def leaveFunctionDef(self, node, frame):
+        if frame.closure:
             bottom = f"{self._bottom_counter}"
             self._bottom_counter += 1
             self.graph.connect(self.tail, bottom)
             self.graph.connect(node, bottom)
             self.tail = bottom
         else:
-            self.graph = PathGraph(node)
-            self.tail = node
-            self.dispatch_list(node.body)
             self.graphs[f"{self.classname}{node.name}"] = self.graph
             self.reset()
 
     def visitClassDef(self, node):
-        old_classname = self.classname
+        frame = _McCabeFrame(node)
+        frame.classname = self.classname
         self.classname += node.name + "."
-        self.dispatch_list(node.body)
-        self.classname = old_classname
+        self._frames.append(frame)
+
+    def leaveClassDef(self, _node, frame):
+        self.classname = frame.classname
 
     def visitSimpleStatement(self, node):
         self._append_node(node)
 
-    visitAssert = visitAssign = visitAugAssign = visitDelete = visitPrint = \
-        visitRaise = visitYield = visitImport = visitCall = visitSubscript = \
-        visitPass = visitContinue = visitBreak = visitGlobal = visitReturn = \
-        visitExpr = visitSimpleStatement
+    visitAssert = visitAssign = visitAugAssign = visitDelete = visitRaise = \
+        visitImport = visitPass = visitContinue = visitBreak = visitGlobal = \
+        visitReturn = visitExpr = visitSimpleStatement
 
     def visitIf(self, node):
         name = f"If {node.lineno}"
@@ -382,60 +1013,88 @@ class McCabeASTVisitor(object):
 
     visitFor = visitWhile = visitLoop
 
-    def visitTryExcept(self, node):
+    def visitTry(self, node):
         name = f"TryExcept {node.lineno}"
-        self._subgraph(node, name, extra_blocks=node.handlers)
+        self._subgraph(node, name)
 
-    visitTry = visitTryExcept
+    def visitExceptHandler(self, node):
+        # the handlers of a `try` statement are extra blocks of its subgraph
+        frame = self._frames[-1]
+        frame.loose_ends.append(self.tail)
+        self.tail = frame.node
+        self._frames.append(_McCabeFrame(node))
 
     def visitWith(self, node):
         self._append_node(node)
-        self.dispatch_list(node.body)
+        self._frames.append(_McCabeFrame(node))
 
     def _append_node(self, node):
         if not self.tail:
-            return
+            return None
         self.graph.connect(self.tail, node)
         self.tail = node
         return node
 
-    def _subgraph(self, node, name, extra_blocks=()):
+    def _subgraph(self, node, name):
         """create the subgraphs representing any `if` and `for` statements"""
+        frame = _McCabeFrame(node)
+        frame.name = name
+        if node.orelse:
+            frame.orelse_start = (node.orelse[0].lineno,
+                                  node.orelse[0].col_offset)
+        finalbody = getattr(node, 'finalbody', None)
+        if finalbody:
+            frame.finalbody_start = (finalbody[0].lineno,
+                                     finalbody[0].col_offset)
         if self.graph is None:
             # global loop
-            self.graph = PathGraph(node)
-            self._subgraph_parse(node, extra_blocks)
-            self.graphs[f"{self.classname}{name}"] = self.graph
-            self.reset()
+            frame.global_graph = True
+            self.graph = self._graph_class(node)
         else:
             self._append_node(node)
-            self._subgraph_parse(node, extra_blocks)
-
-    def _subgraph_parse(self, node, extra_blocks):
-        """parse the body and any `else` block of `if` and `for` statements"""
-        loose_ends = []
         self.tail = node
-        self.dispatch_list(node.body)
+        self._frames.append(frame)
+
+    def _subgraph_leave(self, node, frame):
+        """join the loose ends of the blocks of `if` and `for` statements"""
+        if frame.orelse_start is not None:
+            self._enter_orelse(frame)
+        loose_ends = frame.loose_ends
         loose_ends.append(self.tail)
-        for extra in extra_blocks:
-            self.tail = node
-            self.dispatch_list(extra.body)
-            loose_ends.append(self.tail)
-        if node.orelse:
-            self.tail = node
-            self.dispatch_list(node.orelse)
-            loose_ends.append(self.tail)
-        else:
+        if not node.orelse:
             loose_ends.append(node)
-        if node:
-            bottom = f"{self._bottom_counter}"
-            self._bottom_counter += 1
-            for le in loose_ends:
-                self.graph.connect(le, bottom)
-            self.tail = bottom
+        bottom = f"{self._bottom_counter}"
+        self._bottom_counter += 1
+        for le in loose_ends:
+            self.graph.connect(le, bottom)
+        self.tail = bottom
+        if frame.global_graph:
+            self.graphs[f"{self.classname}{frame.name}"] = self.graph
+            self.reset()
 
+    leaveIf = leaveFor = leaveWhile = leaveTry = _subgraph_leave
 
-class McCabeChecker(BaseChecker):
+
+class _McCabeFrame(object):
+    """A node of the module walk whose statements are part of McCabe graphs"""
+
+    __slots__ = ('node', 'name', 'loose_ends', 'global_graph', 'closure',
+                 'classname', 'orelse_start', 'finalbody_start', 'ignored')
+
+    def __init__(self, node):
+        self.node = node
+        self.name = None
+        self.loose_ends = []
+        self.global_graph = False
+        self.closure = False
+        self.classname = None
+        self.orelse_start = None
+        self.finalbody_start = None
+        self.ignored = False
+
+
+class McCabeChecker(ProfiledCallbacksMixin, CachedResultsMixin,
+                    BaseChecker):
     """Checks for functions or methods having a high McCabe number"""
 
     name = 'mccabe'
@@ -456,39 +1115,99 @@ class McCabeChecker(BaseChecker):
                 {'default': 20, 'type': 'int', 'metavar': '<int>',
                  'help': 'Maximum simplified McCabe cyclomatic number for a '
                          'function or a method'}),
+               ('mccabe-graphs',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'File to which the McCabe graphs of the checked '
+                         'modules are appended in DOT format, for debugging. '
+                         'When empty, only the complexity is computed, without '
+                         'building the graphs'}),
+               ('metrics-file',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'File to which the McCabe numbers and the comments '
+                         'ratio of every function are appended, as one JSON '
+                         'object per line'}),
               )
 
-    def __init__(self, linter=None):
+    def __init__(self, linter=None, metrics_export=None):
         BaseChecker.__init__(self, linter)
-        self.config = linter.config
+        self.metrics_export = metrics_export or MetricsExport(linter)
         self.simplified_mccabe_number = []
+        self._graph_builder = None
 
-    @utils.only_required_for_messages('too-high-complexity')
     def visit_module(self, node):
-        max_mccabe_number = getattr(self.config, 'max_mccabe_number', self.options[0][1]['default'])
-        visitor = McCabeASTVisitor()
-        for child in node.body:
-            visitor.preorder(child, visitor)
-        for graph in visitor.graphs.values():
+        self.metrics_export.enter_module(node)
+        self.simplified_mccabe_number = []
+        self._graph_builder = None
+        if self.linter.is_message_enabled('too-high-complexity') \
+                or self.metrics_export.path:
+            if self._graphs_file():
+                self._graph_builder = McCabeGraphBuilder(PathGraph)
+            else:
+                self._graph_builder = McCabeGraphBuilder()
+            self._graph_builder.visit(node)
+
+    def leave_module(self, node):
+        if self._graph_builder is not None:
+            self._report_graphs(node)
+        self.metrics_export.leave_module(node)
+
+    def _report_graphs(self, node):
+        self._graph_builder.leave(node)
+        max_mccabe_number = getattr(self.linter.config, 'max_mccabe_number',
+                                    self.options[0][1]['default'])
+        enabled = self.linter.is_message_enabled('too-high-complexity')
+        export = bool(self.metrics_export.path)
+        for graph in self._graph_builder.graphs.values():
             complexity = graph.complexity()
-            if complexity > max_mccabe_number:
+            if export and isinstance(graph.root, astroid.FunctionDef):
+                self.metrics_export.record(graph.root, mccabe=complexity)
+            if enabled and complexity > max_mccabe_number:
                 self.add_message('too-high-complexity', node=graph.root,
                                  args=(complexity,
                                        max_mccabe_number))
+        if self._graphs_file():
+            with open(self._graphs_file(), 'a', encoding='utf-8') as stream:
+                for name, graph in self._graph_builder.graphs.items():
+                    stream.write(graph.to_dot(f'{node.name}:{name}'))
+        self._graph_builder = None
+
+    def _graphs_file(self):
+        return getattr(self.linter.config, 'mccabe_graphs', self.options[2][1]['default'])
+
+    def _visit_graph(self, node):
+        """Feed the McCabe graph builder with `node`"""
+        if self._graph_builder is not None:
+            self._graph_builder.visit(node)
+
+    def _leave_graph(self, node):
+        """Feed the McCabe graph builder with the end of `node`"""
+        if self._graph_builder is not None:
+            self._graph_builder.leave(node)
+
+    visit_classdef = visit_with = visit_assert = visit_assign = \
+        visit_augassign = visit_delete = visit_raise = visit_import = \
+        visit_pass = visit_continue = visit_break = visit_global = \
+        visit_return = visit_expr = visit_try = _visit_graph
+    leave_classdef = leave_if = leave_for = leave_while = leave_try = \
+        leave_with = leave_excepthandler = _leave_graph
 
     def visit_functiondef(self, node):
+        self._visit_graph(node)
         self.simplified_mccabe_number.append(0)
 
-    @utils.only_required_for_messages('max-simplified-mccabe-number')
     def leave_functiondef(self, node):
-        max_simplified_mccabe_number = getattr(self.config, 'max_simplified_mccabe_number', self.options[1][1]['default'])
+        self._leave_graph(node)
+        max_simplified_mccabe_number = getattr(self.linter.config, 'max_simplified_mccabe_number', self.options[1][1]['default'])
         complexity = self.simplified_mccabe_number.pop()
+        if self.metrics_export.path:
+            self.metrics_export.record(node, simplified_mccabe=complexity)
         if complexity > max_simplified_mccabe_number:
             self.add_message('too-high-complexity-simplified', node=node,
                              args=(complexity,
                                    max_simplified_mccabe_number))
 
     def visit_while(self, node):
+        self._visit_graph(node)
         if self.simplified_mccabe_number:
             self.simplified_mccabe_number[-1] += 1
 
@@ -496,7 +1215,8 @@ class McCabeChecker(BaseChecker):
             = visit_excepthandler = visit_while
 
 
-class SphinxDocChecker(docparams.DocstringParameterChecker):
+class SphinxDocChecker(ProfiledCallbacksMixin, CachedResultsMixin,
+                       docparams.DocstringParameterChecker):
     """Checks sphinx documentation in docstrings"""
 
     name = 'sphinxdoc'
@@ -513,63 +1233,125 @@ class SphinxDocChecker(docparams.DocstringParameterChecker):
                      'missing-docstring-description',
                      'Used when no description exists for a docstring')
 
-    regexp = {}
-    for field in ('author', 'version', 'date'):
-        regexp[field] = (re.compile(fr':{field}:'),
-                         re.compile(fr':{field}: \S+'))
+    FIELDS = ('author', 'version', 'date')
+    # the analysis of docparams is only run on the modules where one of these
+    # is enabled
+    DOCPARAMS_MSGIDS = tuple(docparams.DocstringParameterChecker.msgs)
+
+    def __init__(self, linter=None):
+        super(SphinxDocChecker, self).__init__(linter)
+        self._docparams_enabled = True
 
-    @utils.only_required_for_messages('malformed-docstring-field', 'missing-docstring-field')
     def visit_module(self, node):
-        if not hasattr(node, 'doc') :
+        self._docparams_enabled = any(map(self._is_enabled_in_module,
+                                          self.DOCPARAMS_MSGIDS))
+        if not (self.linter.is_message_enabled('malformed-docstring-field')
+                or self.linter.is_message_enabled('missing-docstring-field')):
             return
-        if not node.doc:
+        docstring = parse_docstring(_docstring(node))
+        if docstring is None:
             return
-        for field, expr in self.regexp.values():
-            self._check_docstring_field(node, field, expr)
+        for field in self.FIELDS:
+            self._check_docstring_field(node, docstring, field)
+
+    def _is_enabled_in_module(self, msgid):
+        """Return True if message `msgid` is enabled on a line of the module
+        being checked, its pragmas included
+        """
+        # pylint: disable=protected-access
+        lines = self.linter.file_state._module_msgs_state.get(msgid)
+        if lines:
+            return any(lines.values())
+        return self.linter.is_message_enabled(msgid)
 
-    @utils.only_required_for_messages('malformed-docstring-field', 'missing-docstring-field')
+    @utils.only_required_for_messages('missing-docstring-description')
     def visit_classdef(self, node):
-        if not hasattr(node, 'doc') :
-            return
-        if not node.doc:
-            return
         self._check_description_exists(node)
 
-    @utils.only_required_for_messages('malformed-docstring-field', 'missing-docstring-field')
     def visit_functiondef(self, node):
-        super(SphinxDocChecker, self).visit_functiondef(node)
-        if not hasattr(node, 'doc') :
-            return
-        if not node.doc:
-            return
-        self._check_description_exists(node)
+        if self._docparams_enabled:
+            super(SphinxDocChecker, self).visit_functiondef(node)
+        if self.linter.is_message_enabled('missing-docstring-description'):
+            self._check_description_exists(node)
+
+    def visit_asyncfunctiondef(self, node):
+        if self._docparams_enabled:
+            super(SphinxDocChecker, self).visit_functiondef(node)
+
+    def visit_raise(self, node):
+        if self._docparams_enabled:
+            super(SphinxDocChecker, self).visit_raise(node)
+
+    def visit_return(self, node):
+        if self._docparams_enabled:
+            super(SphinxDocChecker, self).visit_return(node)
+
+    def visit_yield(self, node):
+        if self._docparams_enabled:
+            super(SphinxDocChecker, self).visit_yield(node)
+
+    visit_yieldfrom = visit_yield
 
     def _check_description_exists(self, node):
         """Check docstring of node `node` contains a description part
 
         To do so, check the first line contains something
         """
-        if not hasattr(node, 'doc') :
-            return
-        doc_lines = [line.strip() for line in node.doc.splitlines() if line]
-        if not doc_lines or doc_lines[0].startswith(':'):
+        docstring = parse_docstring(_docstring(node))
+        if docstring is not None and not docstring.has_description:
             self.add_message('missing-docstring-description', node=node,
                              args=node.name.split('.')[-1])
 
-    def _check_docstring_field(self, node, field, expr):
-        """Check `field` re exists in `node` docstring and the format is `expr`
+    def _check_docstring_field(self, node, docstring, field):
+        """Check `field` exists in the parsed `docstring` of `node` and has a
+        value
         """
-        if not expr.search(node.doc):
-            if field.search(node.doc):
+        if not docstring.fields.get(field):
+            if field in docstring.fields:
                 msg = 'malformed-docstring-field'
             else:
                 msg = 'missing-docstring-field'
             self.add_message(msg, node=node,
-                             args=(field.pattern.replace(':', ''),
-                                   node.name.split('.')[-1]))
+                             args=(field, node.name.split('.')[-1]))
+
+
+ParsedDocstring = namedtuple('ParsedDocstring', 'fields has_description')
 
+# a field marker and, when followed by a space then a value, that value
+_FIELD_RE = re.compile(r':([^:\s]+)(?=:( \S)?)')
 
-class ForbiddenUsageChecker(BaseChecker):
+
+def _docstring(node):
+    """Return the docstring of `node`, or None"""
+    doc_node = getattr(node, 'doc_node', None)
+    return doc_node.value if doc_node is not None else None
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_docstring(docstring):
+    """Parse `docstring` in a single pass, or return None if it is empty
+
+    `fields` maps each `:name:` field found to True when at least one of its
+    occurrences has a value. The description is missing when the first non
+    empty line starts with a field. Results are memoized on the docstring
+    content, as generated or templated code repeats the same docstrings.
+    """
+    if not docstring:
+        return None
+    fields = {}
+    for match in _FIELD_RE.finditer(docstring):
+        fields[match.group(1)] = fields.get(match.group(1)) or \
+            match.group(2) is not None
+    has_description = False
+    for line in docstring.splitlines():
+        if line:
+            has_description = not line.strip().startswith(':')
+            break
+    return ParsedDocstring(fields, has_description)
+
+
+class ForbiddenUsageChecker(ProfiledCallbacksMixin, CachedResultsMixin,
+                            BaseChecker):
     """Checks for use of forbidden functions or variables"""
 
     name = 'forbiddenusage'
@@ -595,12 +1377,25 @@ class ForbiddenUsageChecker(BaseChecker):
                      ),
            }
 
-    def __init__(self, linter=None):
+    # modules and module attributes tracked through the imports binding them
+    MODULES = {'os': 'os', os.name: 'os', 'sys': 'sys'}
+    QUALIFIED_NAMES = ('os.environ', 'os.getenv', 'os.putenv', 'os.unsetenv',
+                       'sys.argv', 'sys.exit')
+    IDENTIFIERS = frozenset(list(MODULES)
+                            + [name.split('.')[1] for name in QUALIFIED_NAMES])
+
+    def __init__(self, linter=None, inference_cache=None):
         BaseChecker.__init__(self, linter)
+        if inference_cache is None:
+            inference_cache = InferenceCache()
+        self.inference_cache = inference_cache
         self._main_module = False
         self._authorized_exits = []
 
     def visit_module(self, node):
+        self.inference_cache.enter_module(node)
+        self._main_module = False
+        self._authorized_exits = []
         if node.name.split('.')[-1] == '__main__':
             # this is the main module, tolerate calls to sys.exit in the module
             # scope
@@ -625,6 +1420,117 @@ class ForbiddenUsageChecker(BaseChecker):
                 if self._is_sys_exit_call(call):
                     self._authorized_exits.append(call)
 
+    def leave_module(self, node):
+        self.inference_cache.leave_module(node)
+
+    def _import_bindings(self, node):
+        """Return the tracked qualified names bound by import node `node`
+
+        The result maps the local names to the qualified names, e.g.
+        `{'e': 'os.environ'}` for `from os import environ as e`.
+        """
+        bindings = {}
+        if isinstance(node, astroid.ImportFrom):
+            module = self.MODULES.get(node.modname)
+            if module is None or node.level:
+                return bindings
+            for name, alias in node.names:
+                if name == '*':
+                    for qualified_name in self.QUALIFIED_NAMES:
+                        if qualified_name.startswith(module + '.'):
+                            bindings[qualified_name.split('.')[1]] = qualified_name
+                elif f'{module}.{name}' in self.QUALIFIED_NAMES:
+                    bindings[alias or name] = f'{module}.{name}'
+            return bindings
+        for name, alias in node.names:
+            if not alias:
+                name = alias = name.split('.')[0]
+            if name in self.MODULES:
+                bindings[alias] = self.MODULES[name]
+        return bindings
+
+    def _resolve(self, node, bindings=()):
+        """Return the set of tracked qualified names `node` may refer to
+
+        `node` is a name or an attribute, whose names are resolved through the
+        imports, parameters and plain assignments binding them in their scope.
+        None is returned when `node` cannot be resolved that way: inference
+        must be used for the names bound otherwise (loops, calls...), and for
+        the names an untracked module may provide (`from genericpath import
+        *`). `bindings` are the assignments being resolved, not to follow
+        again.
+        """
+        if isinstance(node, astroid.Attribute):
+            if not isinstance(node.expr, astroid.Name):
+                if node.attrname in self.IDENTIFIERS:
+                    return None
+                return set()
+            modules = self._resolve(node.expr, bindings)
+            if modules is None:
+                return None
+            return {f'{module}.{node.attrname}' for module in modules}
+        if not isinstance(node, astroid.Name):
+            return None
+        qualified_names = set()
+        _, assignments = node.lookup(node.name)
+        for assignment in assignments:
+            if isinstance(assignment, astroid.ImportFrom) \
+                    and (assignment.level
+                         or assignment.modname not in self.MODULES):
+                # the module may provide os, sys or their attributes itself
+                if node.name in self.IDENTIFIERS or any(
+                        name == '*' for name, _ in assignment.names):
+                    return None
+            elif isinstance(assignment, (astroid.Import, astroid.ImportFrom)):
+                qualified_name = self._import_bindings(assignment).get(
+                    node.name)
+                if qualified_name:
+                    qualified_names.add(qualified_name)
+            elif isinstance(assignment, astroid.AssignName):
+                if assignment in bindings:
+                    return None
+                assigned = self._resolve_assigned(assignment,
+                                                  bindings + (assignment,))
+                if assigned is None:
+                    return None
+                qualified_names |= assigned
+            elif not isinstance(assignment, (astroid.FunctionDef,
+                                             astroid.ClassDef,
+                                             astroid.Arguments)) \
+                    and assignment.root().name != 'builtins':
+                return None
+        return qualified_names
+
+    # values which are never one of the tracked objects
+    LITERALS = (astroid.Const, astroid.JoinedStr, astroid.List, astroid.Tuple,
+                astroid.Set, astroid.Dict, astroid.ListComp, astroid.SetComp,
+                astroid.DictComp, astroid.GeneratorExp, astroid.Lambda)
+
+    def _resolve_assigned(self, assign_name, bindings):
+        """Return the set of tracked qualified names the name bound by
+        `assign_name` may refer to, or None if it must be inferred
+
+        Parameters are inferred as their default value, if any, and the names
+        assigned a single value as that value.
+        """
+        parent = assign_name.parent
+        if isinstance(parent, astroid.Arguments):
+            try:
+                value = parent.default_value(assign_name.name)
+            except NoDefault:
+                return set()
+        elif isinstance(parent, (astroid.Assign, astroid.AnnAssign)):
+            value = parent.value
+            if value is None:
+                return set()
+        else:
+            return None
+        if isinstance(value, self.LITERALS):
+            return set()
+        if isinstance(value, (astroid.Name, astroid.Attribute)):
+            return self._resolve(value, bindings)
+        return None
+
     @utils.only_required_for_messages('sys-exit-used')
     def visit_call(self, node):
         self._check_os_environ_call(node)
@@ -638,17 +1544,31 @@ class ForbiddenUsageChecker(BaseChecker):
 
     @utils.only_required_for_messages('os-environ-used', 'sys-argv-used')
     def visit_attribute(self, node):
-        if self._check_access(node, ('os', os.name), 'environ', astroid.Dict):
+        qualified_names = self._resolve(node)
+        if qualified_names is None:
+            if self._check_access(node, ('os', os.name), 'environ', astroid.Dict):
+                self.add_message('os-environ-used', node=node, args='environ')
+            if self._check_access(node, ('sys',), 'argv', astroid.List):
+                self.add_message('sys-argv-used', node=node)
+            return
+        if 'os.environ' in qualified_names:
             self.add_message('os-environ-used', node=node, args='environ')
-        if self._check_access(node, ('sys',), 'argv', astroid.List):
+        if 'sys.argv' in qualified_names:
             self.add_message('sys-argv-used', node=node)
 
     @utils.only_required_for_messages('os-environ-used', 'sys-argv-used')
     def visit_name(self, node):
-        if self._check_access(node, ('os', os.name), 'environ', astroid.Dict,
-                              False):
+        qualified_names = self._resolve(node)
+        if qualified_names is None:
+            if self._check_access(node, ('os', os.name), 'environ', astroid.Dict,
+                                  False):
+                self.add_message('os-environ-used', node=node, args='environ')
+            if self._check_access(node, ('sys',), 'argv', astroid.List, False):
+                self.add_message('sys-argv-used', node=node)
+            return
+        if 'os.environ' in qualified_names:
             self.add_message('os-environ-used', node=node, args='environ')
-        if self._check_access(node, ('sys',), 'argv', astroid.List, False):
+        if 'sys.argv' in qualified_names:
             self.add_message('sys-argv-used', node=node)
 
     def _check_access(self, node, modules, var, vtype, attribute=True):
@@ -657,14 +1577,14 @@ class ForbiddenUsageChecker(BaseChecker):
         In case it is, display `msg`
         """
         try:
-            for infer in node.infer():
+            for infer in self.inference_cache.infer(node):
                 if (not isinstance(infer, vtype)
                         or infer.name != var):
                     continue
                 if attribute:
                     try:
-                        orig = node.expr.inferred()[0]
-                    except Exception:
+                        orig = next(self.inference_cache.infer(node.expr))
+                    except (InferenceError, StopIteration):
                         continue
                 else:
                     orig = infer.parent
@@ -677,8 +1597,11 @@ class ForbiddenUsageChecker(BaseChecker):
     def _is_sys_exit_call(self, node):
         """Return True if call node `node` is a call to sys.exit(), else False
         """
+        qualified_names = self._resolve(node.func)
+        if qualified_names is not None:
+            return 'sys.exit' in qualified_names
         try:
-            for funcdef in node.func.infer():
+            for funcdef in self.inference_cache.infer(node.func):
                 if (funcdef.name == 'exit'
                         and isinstance(funcdef.parent, astroid.Module)
                         and funcdef.parent.name == 'sys'):
@@ -690,22 +1613,66 @@ class ForbiddenUsageChecker(BaseChecker):
     def _check_os_environ_call(self, node):
         """Return True if node `node` accesses os.environ, else False
         """
+        qualified_names = self._resolve(node.func)
+        if qualified_names is not None:
+            for qualified_name in sorted(qualified_names):
+                if qualified_name in ('os.putenv', 'os.getenv', 'os.unsetenv'):
+                    self.add_message('os-environ-used', node=node,
+                                     args=f"{qualified_name.split('.')[1]}()")
+                    return True
+            return False
         try:
-            for funcdef in node.func.infer():
+            for funcdef in self.inference_cache.infer(node.func):
                 if (funcdef.name in ('putenv', 'getenv', 'unsetenv')
                         and funcdef.root().name in('os', os.name)):
                     self.add_message('os-environ-used', node=node,
                                      args=f"{funcdef.name}()")
-                    return
+                    return True
         except InferenceError:
             pass
         return False
 
 
+def _prepare_checkers(linter, prepare_checkers):
+    """Return the checkers needed by `linter`, with the metrics checkers when
+    the metrics are exported, even if their messages are disabled
+    """
+    checkers = prepare_checkers()
+    if getattr(linter.config, 'metrics_file', ''):
+        checkers += [checker for checker in linter.get_checkers()
+                     if isinstance(checker, (CommentMetricsChecker,
+                                             McCabeChecker))
+                     and checker not in checkers]
+    return checkers
+
+
 def register(linter):
     """required method to auto register this checker"""
-    linter.register_checker(DesignChecker(linter))
-    linter.register_checker(CommentMetricsChecker(linter))
-    linter.register_checker(McCabeChecker(linter))
-    linter.register_checker(SphinxDocChecker(linter))
-    linter.register_checker(ForbiddenUsageChecker(linter))
+    if any(isinstance(checker, DesignChecker)
+           for checker in linter.get_checkers()):
+        # the workers of pylint -j register the plugins of the linter they
+        # were given again
+        return
+    inference_cache = InferenceCache()
+    metrics_export = MetricsExport(linter)
+    result_cache = ResultCache(linter)
+    profiler = Profiler(linter)
+    for checker in (DesignChecker(linter, inference_cache),
+                    CommentMetricsChecker(linter, metrics_export),
+                    McCabeChecker(linter, metrics_export),
+                    SphinxDocChecker(linter),
+                    ForbiddenUsageChecker(linter, inference_cache)):
+        checker.result_cache = result_cache
+        checker.profiler = profiler
+        linter.register_checker(checker)
+    linter.register_checker(ResultCacheChecker(linter))
+    linter.register_checker(snapshots.SnapshotChecker(linter))
+    linter.register_checker(pool.PoolChecker(linter))
+    linter.register_checker(ProfileChecker(linter, profiler))
+    linter.prepare_checkers = functools.partial(_prepare_checkers, linter,
+                                                linter.prepare_checkers)
+
+
+def load_configuration(linter):
+    """required method to apply the configuration once it is read"""
+    snapshots.configure(getattr(linter.config, 'snapshot_dir', ''))
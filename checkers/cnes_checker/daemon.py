@@ -0,0 +1,197 @@
+"""Lint daemon keeping the astroid caches warm between runs
+
+::
+
+    cnes-lintd &
+    cnes-lintc [pylint options] files...
+
+`cnes-lintd` listens on a Unix socket and runs pylint, with the CNES checkers
+loaded, for each request of `cnes-lintc` (see `client`), in the working
+directory of the client. The modules built by astroid (the checked ones as
+well as `os`, `threading`... reached through inference) are kept from one
+request to the next, and dropped when the modification time of their file
+changes.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import time
+import traceback
+
+import astroid
+from astroid.context import _invalidate_cache
+from astroid.inference_tip import clear_inference_tip_cache
+from astroid.modutils import _has_init
+from astroid.nodes import ClassDef
+from astroid.nodes._base_nodes import LookupMixIn
+from pylint.checkers.utils import clear_lru_caches
+from pylint.lint import Run
+
+from .client import PYLINT_ARGS, default_socket, listening
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class WarmCache(object):
+    """Modification times of the files of the modules cached by astroid"""
+
+    def __init__(self, manager=astroid.MANAGER):
+        self.manager = manager
+        self._mtimes = {}
+
+    def _modules(self):
+        for name, module in list(self.manager.astroid_cache.items()):
+            if module.file and module.file.endswith(('.py', '.pyi')):
+                yield name, module.file
+
+    def record(self, started):
+        """Record the modification times of the files of the modules built
+        by the run started at `started` (in ns); drop those modified since
+        """
+        changed = {}
+        for name, path in self._modules():
+            if path not in self._mtimes:
+                mtime = _mtime(path)
+                if mtime is None or mtime >= started:
+                    # the tree may have been built before the change
+                    changed[name] = path
+                else:
+                    self._mtimes[path] = mtime
+        self._drop(changed)
+
+    def invalidate(self):
+        """Drop the modules whose file changed since they were built, along
+        with the inferences which may involve them; return their files
+        """
+        changed = {}
+        for name, path in self._modules():
+            if path in self._mtimes and self._mtimes[path] != _mtime(path):
+                changed[name] = path
+        self._drop(changed)
+        # the lookups which failed may succeed now
+        for key, value in list(self.manager._mod_file_cache.items()):
+            if isinstance(value, Exception):
+                del self.manager._mod_file_cache[key]
+        return set(changed.values())
+
+    def _drop(self, changed):
+        """Drop the modules of `changed`, mapping their names to their files
+        """
+        if not changed:
+            return
+        paths = set(changed.values())
+        for name in changed:
+            del self.manager.astroid_cache[name]
+        for path in paths:
+            self._mtimes.pop(path, None)
+        for key, value in list(self.manager._mod_file_cache.items()):
+            if getattr(value, 'location', None) in paths:
+                del self.manager._mod_file_cache[key]
+        clear_inference_tip_cache()
+        _invalidate_cache()
+        clear_lru_caches()
+        for cache in (LookupMixIn.lookup, ClassDef._metaclass_lookup_attribute,
+                      _has_init):
+            cache.cache_clear()
+
+
+def lint(args, cwd):
+    """Run pylint with `args` in directory `cwd`; return its exit status and
+    its standard and error outputs
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    previous = os.getcwd()
+    try:
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            try:
+                status = Run(PYLINT_ARGS + list(args),
+                             exit=False).linter.msg_status
+            except SystemExit as exc:
+                status = exc.code if isinstance(exc.code, int) else 1
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+                status = 32
+    except OSError as exc:
+        stderr.write(f'{exc}\n')
+        status = 32
+    finally:
+        os.chdir(previous)
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+class LintHandler(socketserver.StreamRequestHandler):
+    """Answers a lint request: one JSON line with the pylint arguments and the
+    working directory, answered with one JSON line with the exit status and
+    outputs
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            args, cwd = request['args'], request['cwd']
+        except (ValueError, KeyError, TypeError):
+            return
+        started = time.time_ns()
+        self.server.warm_cache.invalidate()
+        status, stdout, stderr = lint(args, cwd)
+        self.server.warm_cache.record(started)
+        self.wfile.write(json.dumps({'status': status, 'stdout': stdout,
+                                     'stderr': stderr}).encode() + b'\n')
+
+
+class LintServer(socketserver.UnixStreamServer):
+    """Server running the lint requests one at a time, pylint and astroid not
+    being thread-safe
+    """
+
+    def __init__(self, path):
+        self.warm_cache = WarmCache()
+        # astroid builds sys from the living module, whose outputs are
+        # redirected while linting
+        astroid.MANAGER.ast_from_module_name('sys')
+        # only the user may connect
+        umask = os.umask(0o177)
+        try:
+            super(LintServer, self).__init__(path, LintHandler)
+        finally:
+            os.umask(umask)
+
+
+def main(argv=None):
+    """Run the lint daemon"""
+    parser = argparse.ArgumentParser(
+        prog='cnes-lintd', description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--socket', metavar='<path>', default=default_socket(),
+                        help='path of the Unix socket to listen on')
+    args = parser.parse_args(argv)
+    if os.path.exists(args.socket):
+        if listening(args.socket):
+            parser.exit(1, f'a daemon already listens on {args.socket}\n')
+        os.unlink(args.socket)
+    server = LintServer(args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
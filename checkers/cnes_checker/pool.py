@@ -0,0 +1,236 @@
+"""Process-pool runner of pylint
+
+The workers of `pylint -j` live for the whole run, and the modules built by
+astroid accumulate in each of them. `PoolRun`, used by `cnes-lint`, lints the
+files in a pool of `--jobs` processes, each replaced by a fresh one after
+`max-files-per-process` files, and reports the messages file by file in the
+order of the files, as a sequential run does. The same runner lints the
+shards of `shard`, and records the lint time of every file when
+`lint-history` is set.
+
+Like pylint, the runner pickles the linter with dill, and it reuses private
+helpers of pylint 3 (`_augment_sys_path`, `_iterate_file_descrs`,
+`_dynamic_plugins`), hence the bounds of the pylint version in setup.py.
+"""
+import collections
+import multiprocessing
+import sys
+import time
+
+import dill
+from pylint.checkers import BaseChecker
+from pylint.lint import PyLinter, Run
+from pylint.lint.expand_modules import discover_package_path
+from pylint.lint.utils import _augment_sys_path, augmented_sys_path
+from pylint.reporters import CollectingReporter
+from pylint.utils import LinterStats, merge_stats
+
+from . import shard
+
+# linter of a worker process
+_worker_linter = None
+
+
+def _initialize_worker(linter, extra_packages_paths):
+    global _worker_linter
+    _worker_linter = dill.loads(linter)
+    _worker_linter.set_reporter(CollectingReporter())
+    _worker_linter.open()
+    # the transforms registered by plugins are not part of the pickle
+    _worker_linter.load_plugin_modules(_worker_linter._dynamic_plugins,
+                                       force=True)
+    _worker_linter.load_plugin_configuration()
+    _augment_sys_path(extra_packages_paths)
+
+
+def _check_file(linter, file_item):
+    """Lint `file_item`; return what is reported of it, and the time taken"""
+    start = time.perf_counter()
+    # the statistics of each file are merged by the main process
+    stats, linter.stats = linter.stats, LinterStats()
+    try:
+        linter.open()
+        linter.check_single_file_item(file_item)
+    finally:
+        stats, linter.stats = linter.stats, stats
+    map_data = {}
+    for checker in linter.get_checkers():
+        data = checker.get_map_data()
+        if data is not None:
+            map_data[checker.name] = data
+    messages = linter.reporter.messages
+    linter.reporter.reset()
+    return (linter.current_name, file_item.filepath,
+            linter.file_state.base_name, messages, stats, linter.msg_status,
+            map_data, time.perf_counter() - start)
+
+
+def _check_file_in_worker(file_item):
+    return _check_file(_worker_linter, file_item)
+
+
+def _dump_linter(linter):
+    """Return the pickle of `linter` for the workers, without its reporter,
+    whose output may not be picklable and which the workers replace
+    """
+    reporter = linter.reporter
+    linter.set_reporter(CollectingReporter())
+    linter.reporter.out = None
+    try:
+        return dill.dumps(linter)
+    finally:
+        linter.set_reporter(reporter)
+
+
+def lint_files(linter, processes, file_items, extra_packages_paths=(),
+               max_files_per_process=None):
+    """Iterate over the results of `_check_file` for `file_items`, in their
+    order, linted in a pool of `processes` processes each linting at most
+    `max_files_per_process` files, or in this process
+    """
+    if processes <= 1:
+        # the results are reported, or not, by the caller
+        reporter, file_state = linter.reporter, linter.file_state
+        linter.set_reporter(CollectingReporter())
+        try:
+            with augmented_sys_path(extra_packages_paths):
+                for file_item in file_items:
+                    yield _check_file(linter, file_item)
+        finally:
+            linter.set_reporter(reporter)
+            linter.file_state = file_state
+        return
+    with multiprocessing.Pool(processes, _initialize_worker,
+                              (_dump_linter(linter), extra_packages_paths),
+                              maxtasksperchild=max_files_per_process) as pool:
+        yield from pool.imap(_check_file_in_worker, file_items)
+
+
+def report_results(linter, results):
+    """Report `results` of `_check_file` to `linter`"""
+    all_stats = []
+    all_map_data = collections.defaultdict(list)
+    for module, filepath, base_name, messages, stats, msg_status, \
+            map_data, _ in results:
+        linter.file_state.base_name = base_name
+        linter.file_state._is_base_filestate = False
+        linter.set_current_module(module, filepath)
+        for message in messages:
+            linter.reporter.handle_message(message)
+        all_stats.append(stats)
+        linter.msg_status |= msg_status
+        for name, data in map_data.items():
+            all_map_data[name].append(data)
+    for checker in linter.get_checkers():
+        if checker.name in all_map_data:
+            checker.reduce_map_data(linter, all_map_data[checker.name])
+    linter.stats = merge_stats([linter.stats, *all_stats])
+
+
+class PoolLinter(PyLinter):
+    """Linter running its parallel, sharded and timed checks with
+    `lint_files`
+    """
+
+    def check(self, files_or_modules):
+        config = self.config
+        history = getattr(config, 'lint_history', '')
+        shard_output = getattr(config, 'shard_output', '')
+        merge = getattr(config, 'merge_shards', False)
+        try:
+            shard_spec = shard.parse_shard(getattr(config, 'shard', ''))
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(32)
+        if config.from_stdin or not (config.jobs > 1 or history or shard_spec
+                                     or shard_output or merge):
+            super(PoolLinter, self).check(files_or_modules)
+            return
+        self.initialize()
+        if merge:
+            # the arguments are the result files of the shards
+            try:
+                results = shard.load_results(files_or_modules)
+            except (OSError, ValueError, KeyError) as exc:
+                print(exc, file=sys.stderr)
+                sys.exit(32)
+        else:
+            results = self._lint_shard(files_or_modules, shard_spec,
+                                       shard.load_history(history)
+                                       if history else {})
+        if shard_output:
+            # the history is recorded on merging, the shards being split with
+            # the same one
+            shard.save_results(shard_output, *results)
+            return
+        self.open()
+        report_results(self, (result[1:] for result in results[1]))
+        if history:
+            shard.save_history(history, ((result[2], result[-1])
+                                         for result in results[1]))
+
+    def _lint_shard(self, files_or_modules, shard_spec, history):
+        """Lint the files of the shard; return the number of files of the
+        whole list, and the results of `_check_file` preceded by the indices
+        of the files in the list
+        """
+        if self.config.recursive:
+            files_or_modules = tuple(self._discover_files(files_or_modules))
+        extra_packages_paths = list(dict.fromkeys(
+            discover_package_path(file_or_module, self.config.source_roots)
+            for file_or_module in files_or_modules))
+        file_items = list(self._iterate_file_descrs(files_or_modules))
+        indices = range(len(file_items))
+        if shard_spec is not None:
+            index, count = shard_spec
+            file_costs = shard.costs([item.filepath for item in file_items],
+                                     history)
+            indices = shard.split(file_costs, count)[index]
+        results = lint_files(self, self.config.jobs,
+                             [file_items[index] for index in indices],
+                             extra_packages_paths,
+                             getattr(self.config, 'max_files_per_process', 0)
+                             or None)
+        return len(file_items), [(index,) + result
+                                 for index, result in zip(indices, results)]
+
+
+class PoolRun(Run):
+    """pylint command line running its parallel checks with `lint_files`"""
+
+    LinterClass = PoolLinter
+
+
+class PoolChecker(BaseChecker):
+    """Holds the options of the process-pool runner and of the shards"""
+
+    name = 'pool'
+    msgs = {}
+    options = (('max-files-per-process',
+                {'default': 0, 'type': 'int', 'metavar': '<int>',
+                 'help': 'Number of files after which a process of '
+                         'cnes-lint -j is replaced by a fresh one, to bound '
+                         'the memory used by the modules built by astroid. '
+                         'Never replaced when 0'}),
+               ('lint-history',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'JSON file where cnes-lint records the time '
+                         'linting each file took, to balance the shards. '
+                         'Recorded when the results are reported, not by the '
+                         'runs with --shard-output'}),
+               ('shard',
+                {'default': '', 'type': 'string', 'metavar': '<K/N>',
+                 'help': 'Make cnes-lint lint only the K-th of N shards of '
+                         'the files, balanced by their lint history or else '
+                         'by their size'}),
+               ('shard-output',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'File where cnes-lint writes the results of the '
+                         'files instead of reporting them, to be merged with '
+                         '--merge-shards'}),
+               ('merge-shards',
+                {'default': False, 'type': 'yn', 'metavar': '<y or n>',
+                 'help': 'Make cnes-lint report the results of the shard '
+                         'files given as arguments, as a run on the whole '
+                         'list of files would'}),
+              )
@@ -0,0 +1,293 @@
+"""Time spent in the callbacks of the CNES checkers
+
+When `profile-checkers` is set, or `profile-file` or `trace-file`, the
+`visit_*`, `leave_*` and `process_*` methods of the CNES checkers are wrapped
+when the checkers are opened, to count their calls, the time spent in them
+and the inferences they request (the calls of `infer` not made by astroid
+itself). The totals of the run are given in the `RP5001` report section
+(with `--reports=y`), and the counts of each module are appended to
+`profile-file` as JSON lines. Nothing is wrapped otherwise.
+
+`trace-file` is written in the Chrome trace-event format, with a span for
+each module, each callback and each inference, to be viewed in a trace
+viewer such as Perfetto or chrome://tracing. The spans of one module out of
+`trace-sample` are recorded, and those shorter than `trace-min-duration`
+dropped.
+"""
+import functools
+import json
+import os
+import sys
+import time
+
+from astroid import nodes
+from pylint.checkers import BaseChecker
+from pylint.exceptions import EmptyReportError
+from pylint.reporters.ureports.nodes import Table
+
+CALLBACK_PREFIXES = ('visit_', 'leave_', 'process_')
+
+_infer = nodes.NodeNG.infer
+# profiler counting the inferences, while the checkers are profiled
+_profiler = None
+
+
+def _counting_infer(node, context=None, **kwargs):
+    """NodeNG.infer counting the calls made by the profiled callbacks"""
+    profiler = _profiler
+    if profiler is None or profiler.active is None or \
+            sys._getframe(1).f_globals.get('__name__', '').startswith(
+                'astroid'):
+        return _infer(node, context, **kwargs)
+    profiler.active[2] += 1
+    if profiler.tracing:
+        return profiler.traced_inference(node,
+                                         _infer(node, context, **kwargs))
+    return _infer(node, context, **kwargs)
+
+
+def merge(totals, counts):
+    """Add `counts` of calls, time and inferences by callback to `totals`"""
+    for key, (calls, elapsed, inferences) in counts.items():
+        total = totals.setdefault(key, [0, 0.0, 0])
+        total[0] += calls
+        total[1] += elapsed
+        total[2] += inferences
+
+
+class Profiler(object):
+    """Counts and spans of the callbacks of the CNES checkers
+
+    Shared by the CNES checkers, whose callbacks are wrapped by `attach`. The
+    counts of a module are added to `totals`, and written to the profile
+    file, when the next module begins or when the check ends; the spans are
+    kept in `events` until the trace is written. As for the result cache,
+    pylint would not run a checker of its own.
+    """
+
+    def __init__(self, linter):
+        self.linter = linter
+        self.totals = {}
+        self.events = []
+        self.active = None
+        self.tracing = False
+        self._clients = []
+        self._module = None
+        self._module_file = None
+        self._module_start = None
+        self._modules = 0
+        self._counts = {}
+
+    @property
+    def path(self):
+        """Path of the profile file, empty when not written"""
+        return getattr(self.linter.config, 'profile_file', '')
+
+    @property
+    def trace_path(self):
+        """Path of the trace file, empty when not written"""
+        return getattr(self.linter.config, 'trace_file', '')
+
+    @property
+    def enabled(self):
+        """True if the callbacks of the CNES checkers are to be profiled"""
+        return bool(getattr(self.linter.config, 'profile_checkers', False)
+                    or self.path or self.trace_path)
+
+    def attach(self, checker):
+        """Profile the callbacks of `checker`"""
+        global _profiler
+        _profiler = self
+        nodes.NodeNG.infer = _counting_infer
+        if checker in self._clients:
+            return
+        self._clients.append(checker)
+        for name in dir(checker):
+            if name.startswith(CALLBACK_PREFIXES):
+                method = getattr(checker, name)
+                if callable(method):
+                    setattr(checker, name,
+                            self._profiled(method, f'{checker.name}.{name}'))
+
+    def _profiled(self, method, key):
+        @functools.wraps(method)
+        def profiled(*args):
+            if self.linter.current_name != self._module:
+                self._begin(self.linter.current_name)
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0, 0.0, 0]
+            active, self.active = self.active, counts
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                counts[1] += time.perf_counter() - start
+                counts[0] += 1
+                self.active = active
+                if self.tracing:
+                    self._add_span(key, 'callback', start,
+                                   args[0] if args else None)
+        return profiled
+
+    def _begin(self, module):
+        self.flush()
+        self._module = module
+        self._module_file = self.linter.current_file
+        self._module_start = time.perf_counter()
+        sample = getattr(self.linter.config, 'trace_sample', 1) or 1
+        self.tracing = bool(self.trace_path) and self._modules % sample == 0
+        self._modules += 1
+
+    def _add_span(self, name, category, start, node=None):
+        """Record a span started at `start`, about `node`"""
+        end = time.perf_counter()
+        duration = (end - start) * 1e6
+        if duration < getattr(self.linter.config, 'trace_min_duration', 0) \
+                and category != 'module':
+            return
+        event = {'name': name, 'cat': category, 'ph': 'X',
+                 'ts': round(start * 1e6, 1), 'dur': round(duration, 1),
+                 'pid': os.getpid(), 'tid': 0}
+        if isinstance(node, nodes.NodeNG):
+            event['args'] = {'node': type(node).__name__,
+                             'line': node.fromlineno}
+        elif category == 'module':
+            event['args'] = {'path': self._module_file}
+        self.events.append(event)
+
+    def traced_inference(self, node, values):
+        """Iterate over `values` inferred for `node`, recording the span of
+        the inference until they are consumed
+        """
+        start = time.perf_counter()
+        try:
+            yield from values
+        finally:
+            self._add_span('infer', 'inference', start, node)
+
+    def flush(self):
+        """Add the counts of the current module to the totals, and write
+        them
+        """
+        counts, self._counts = self._counts, {}
+        if self.tracing and self._module_start is not None:
+            self._add_span(self._module, 'module', self._module_start)
+        self.tracing = False
+        self._module_start = None
+        if counts:
+            merge(self.totals, counts)
+            if self.path:
+                record = {'module': self._module, 'callbacks': {
+                    key: [calls, round(elapsed, 6), inferences]
+                    for key, (calls, elapsed, inferences)
+                    in sorted(counts.items())}}
+                with open(self.path, 'a', encoding='utf-8') as stream:
+                    stream.write(json.dumps(record) + '\n')
+        self._module = None
+
+    def detach(self):
+        """End the check: flush the counts and stop counting inferences"""
+        global _profiler
+        self.flush()
+        if _profiler is not self:
+            return
+        _profiler = None
+        nodes.NodeNG.infer = _infer
+        # the trace of the processes of pylint -j is written by the main one
+        if self.linter.config.jobs <= 1:
+            self.write_trace()
+
+    def write_trace(self):
+        """Write the recorded spans to the trace file"""
+        if not self.trace_path:
+            return
+        temporary = f'{self.trace_path}.{os.getpid()}'
+        with open(temporary, 'w', encoding='utf-8') as stream:
+            json.dump({'traceEvents': self.events,
+                       'displayTimeUnit': 'ms'}, stream)
+        os.replace(temporary, self.trace_path)
+
+
+class ProfiledCallbacksMixin(object):
+    """Mixin of the checkers whose callbacks are profiled by a Profiler"""
+
+    profiler = None
+
+    def open(self):
+        super(ProfiledCallbacksMixin, self).open()
+        if self.profiler is not None and self.profiler.enabled:
+            self.profiler.attach(self)
+
+    def close(self):
+        super(ProfiledCallbacksMixin, self).close()
+        if self.profiler is not None:
+            self.profiler.detach()
+
+
+class ProfileChecker(BaseChecker):
+    """Holds the options of the profiler, reports its totals and gathers
+    those of the processes of `pylint -j`
+    """
+
+    name = 'profile'
+    msgs = {}
+    options = (('profile-checkers',
+                {'default': False, 'type': 'yn', 'metavar': '<y or n>',
+                 'help': 'Count the calls, time and inferences of the '
+                         'callbacks of the CNES checkers, reported with '
+                         '--reports=y'}),
+               ('profile-file',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'File where the counts of the callbacks of the CNES '
+                         'checkers are appended, as one JSON line per '
+                         'module. Implies profile-checkers'}),
+               ('trace-file',
+                {'default': '', 'type': 'string', 'metavar': '<file>',
+                 'help': 'File where the spans of the modules, of the '
+                         'callbacks of the CNES checkers and of their '
+                         'inferences are written in the Chrome trace-event '
+                         'format. Implies profile-checkers'}),
+               ('trace-sample',
+                {'default': 1, 'type': 'int', 'metavar': '<n>',
+                 'help': 'Trace one module out of this number'}),
+               ('trace-min-duration',
+                {'default': 0, 'type': 'int', 'metavar': '<microseconds>',
+                 'help': 'Duration under which the spans of the callbacks '
+                         'and inferences are not traced'}),
+              )
+
+    def __init__(self, linter, profiler):
+        super(ProfileChecker, self).__init__(linter)
+        self.profiler = profiler
+        self.reports = (('RP5001', 'CNES checkers callbacks',
+                         self.report_callbacks),)
+
+    def get_map_data(self):
+        # the totals and spans of each file are reduced by the main process
+        self.profiler.flush()
+        totals, self.profiler.totals = self.profiler.totals, {}
+        events, self.profiler.events = self.profiler.events, []
+        return (totals, events) if totals or events else None
+
+    def reduce_map_data(self, linter, data):
+        self.profiler.totals = {}
+        self.profiler.events = []
+        for totals, events in data:
+            merge(self.profiler.totals, totals)
+            self.profiler.events += events
+        self.profiler.write_trace()
+
+    def report_callbacks(self, sect, stats, old_stats):
+        """Report the counts of the callbacks, the most costly first"""
+        self.profiler.flush()
+        totals = self.profiler.totals
+        if not totals:
+            raise EmptyReportError()
+        elapsed = sum(counts[1] for counts in totals.values()) or 1.0
+        lines = ['callback', 'calls', 'time (ms)', '%', 'inferences']
+        for key, (calls, seconds, inferences) in sorted(
+                totals.items(), key=lambda item: -item[1][1]):
+            lines += [key, str(calls), f'{seconds * 1000:.1f}',
+                      f'{seconds * 100 / elapsed:.2f}', str(inferences)]
+        sect.append(Table(children=lines, cols=5, rheaders=1))
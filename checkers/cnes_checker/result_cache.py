@@ -0,0 +1,365 @@
+"""On-disk cache of the messages emitted by the CNES checkers
+
+The messages emitted for a module are stored in the `result-cache-dir`
+directory, with the hash of the module source and of the modules it imports.
+When a module is checked again with the same plugin, pylint and astroid
+versions, CNES options and enabled messages, and neither its source nor the
+sources reached through its imports changed, the messages are replayed and the
+CNES checkers skip the module.
+"""
+import functools
+import glob
+import hashlib
+import itertools
+import json
+import os
+
+import astroid
+from astroid.exceptions import AstroidError
+import pylint
+from pylint.checkers import BaseChecker
+from pylint.interfaces import CONFIDENCE_LEVELS
+
+
+def _hash_file(path):
+    """Return the sha256 of the content of file `path`, or None"""
+    try:
+        with open(path, 'rb') as stream:
+            return hashlib.sha256(stream.read()).hexdigest()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _plugin_version():
+    """Return a hash of the sources of the plugin"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__),
+                                              '*.py'))):
+        digest.update(_hash_file(path).encode())
+    return digest.hexdigest()
+
+
+def _node_path(node, module):
+    """Return the indices leading from `module` to `node` in the tree, or
+    None if `node` is not part of `module`
+    """
+    path = []
+    while node is not module:
+        parent = node.parent
+        if parent is None:
+            return None
+        for index, child in enumerate(parent.get_children()):
+            if child is node:
+                break
+        else:
+            return None
+        path.append(index)
+        node = parent
+    path.reverse()
+    return path
+
+
+def _imported_names(module):
+    """Return the names of the modules which `module` may import"""
+    names = set()
+    if module is None:
+        return names
+    for node in module.nodes_of_class((astroid.Import, astroid.ImportFrom)):
+        if isinstance(node, astroid.Import):
+            names.update(name for name, _ in node.names)
+            continue
+        try:
+            base = module.relative_to_absolute_name(node.modname, node.level)
+        except AstroidError:
+            continue
+        # the imported names may be submodules
+        names.add(base)
+        names.update(f'{base}.{name}' for name, _ in node.names
+                     if name != '*')
+    return names
+
+
+def _find_node(module, path):
+    """Return the node at `path` in `module`, as returned by _node_path"""
+    node = module
+    for index in path:
+        node = next(itertools.islice(node.get_children(), index, None))
+    return node
+
+
+class ResultCache(object):
+    """Messages of the CNES checkers stored by module
+
+    Shared by the CNES checkers, whose callbacks are wrapped by `attach`: the
+    first callback run for a module looks its results up, and the callbacks
+    do nothing while the messages of the module are replayed. Otherwise the
+    messages are recorded through `record`, and written when the next module
+    begins or when the check ends. pylint does not run checkers without
+    enabled messages, hence the cache cannot be driven by a checker of its
+    own.
+    """
+
+    def __init__(self, linter):
+        self.linter = linter
+        self.replaying = False
+        self.hits = 0
+        self.misses = 0
+        self._clients = []
+        self._key = None
+        self._hashes = {}
+        self._dependencies = {}
+        self._fresh = {}
+        self._file = None
+        self._module = None
+        self._pending = None
+        self._replayed = None
+
+    def reset(self):
+        """Forget the state of the previous check, as files may have changed
+        """
+        self._key = None
+        self._hashes = {}
+        self._dependencies = {}
+        self._fresh = {}
+        self._file = None
+        self._module = None
+        self._pending = None
+        self._replayed = None
+
+    @property
+    def directory(self):
+        """Directory of the cache, empty when the cache is disabled"""
+        return getattr(self.linter.config, 'result_cache_dir', '')
+
+    @property
+    def enabled(self):
+        """True if the cache is used; the runs writing metrics or graphs do
+        not, as those outputs are not cached
+        """
+        config = self.linter.config
+        return bool(self.directory and not getattr(config, 'metrics_file', '')
+                    and not getattr(config, 'mccabe_graphs', ''))
+
+    def attach(self, checker):
+        """Make the callbacks of `checker` skip the replayed modules"""
+        if checker in self._clients:
+            return
+        self._clients.append(checker)
+        self._key = None
+        for name in dir(checker):
+            if name.startswith(('visit_', 'leave_')) \
+                    or name == 'process_tokens':
+                method = getattr(checker, name)
+                if callable(method):
+                    setattr(checker, name, self._skipped_on_replay(method))
+
+    def _skipped_on_replay(self, method):
+        @functools.wraps(method)
+        def skipped(*args):
+            if self.linter.current_file != self._file:
+                self.begin(self.linter.current_file)
+            if self._module is None and args \
+                    and isinstance(args[0], astroid.NodeNG):
+                self._module = args[0].root()
+                if self._replayed is not None:
+                    self._replay(self._module)
+            if not self.replaying:
+                return method(*args)
+            return None
+        return skipped
+
+    def begin(self, filename):
+        """Start the check of module `filename`; its cached messages, if still
+        valid, are replayed by the first callback given one of its nodes
+        """
+        self.flush()
+        self._file = filename
+        self._module = None
+        if not filename or not os.path.isfile(filename):
+            return
+        path = os.path.abspath(filename)
+        entry = self._load(path)
+        if entry is not None and entry['key'] == self.key() \
+                and self._is_fresh(path):
+            self.hits += 1
+            self.replaying = True
+            self._replayed = entry['messages']
+        else:
+            self.misses += 1
+            self._pending = {'path': path, 'messages': []}
+
+    def record(self, msgid, line, node, args, confidence, col_offset,
+               end_lineno, end_col_offset):
+        """Record a message emitted for the module being checked"""
+        if self._pending is None:
+            return
+        location = None
+        if node is not None:
+            location = _node_path(node, self._module)
+            if location is None:
+                # emitted on another module: the results are not cached
+                self._pending = None
+                return
+        self._pending['messages'].append(
+            [msgid, line, location, args,
+             confidence.name if confidence else None,
+             col_offset, end_lineno, end_col_offset])
+
+    def flush(self):
+        """Write the results of the module being checked"""
+        self.replaying = False
+        self._replayed = None
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        path = pending['path']
+        dependencies = {}
+        for name in _imported_names(self._module):
+            try:
+                dependency = astroid.MANAGER.file_from_module_name(
+                    name, path).location
+            except (AstroidError, ImportError):
+                continue
+            if dependency and os.path.isfile(dependency):
+                dependency = os.path.abspath(dependency)
+                if dependency != path:
+                    dependencies[dependency] = self._hash(dependency)
+        entry = {'key': self.key(), 'source': self._hash(path),
+                 'dependencies': dependencies,
+                 'messages': pending['messages']}
+        try:
+            content = json.dumps(entry)
+        except (TypeError, ValueError):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        filename = self._filename(path)
+        temporary = f'{filename}.{os.getpid()}'
+        with open(temporary, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        os.replace(temporary, filename)
+        self._dependencies[path] = (entry['source'], dependencies)
+
+    def key(self):
+        """Return the hash of what, besides sources, the messages depend on"""
+        if self._key is None:
+            values = {'plugin': _plugin_version(),
+                      'pylint': pylint.__version__,
+                      'astroid': astroid.__version__}
+            for checker in self._clients:
+                for option, _ in checker.options:
+                    values[option] = getattr(self.linter.config,
+                                             option.replace('-', '_'), None)
+                for message in checker.messages:
+                    values[message.symbol] = \
+                        self.linter.is_message_enabled(message.msgid)
+            self._key = hashlib.sha256(json.dumps(
+                values, sort_keys=True, default=str).encode()).hexdigest()
+        return self._key
+
+    def _filename(self, path):
+        name = hashlib.sha256(path.encode()).hexdigest()
+        return os.path.join(self.directory, f'{name}.json')
+
+    def _load(self, path):
+        try:
+            with open(self._filename(path), encoding='utf-8') as stream:
+                entry = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        self._dependencies[path] = (entry['source'], entry['dependencies'])
+        return entry
+
+    def _hash(self, path):
+        if path not in self._hashes:
+            self._hashes[path] = _hash_file(path)
+        return self._hashes[path]
+
+    def _is_fresh(self, path):
+        """Return True if neither `path` nor the files reached through the
+        recorded dependencies changed since they were recorded
+        """
+        if path in self._fresh:
+            return self._fresh[path]
+        reached = set()
+        stack = [path]
+        fresh = True
+        while stack and fresh:
+            current = stack.pop()
+            if current in reached or self._fresh.get(current):
+                continue
+            reached.add(current)
+            if current not in self._dependencies:
+                self._load(current)
+            if current not in self._dependencies:
+                # not checked with the cache, only its content matters
+                continue
+            source, dependencies = self._dependencies[current]
+            fresh = source == self._hash(current)
+            for dependency, digest in dependencies.items():
+                if self._hash(dependency) != digest:
+                    fresh = False
+                stack.append(dependency)
+        if fresh:
+            # the dependencies of the reached files were all reached as well
+            self._fresh.update(dict.fromkeys(reached, True))
+        else:
+            self._fresh[path] = False
+        return fresh
+
+    def _replay(self, module):
+        """Add the cached messages of `module`"""
+        messages, self._replayed = self._replayed, None
+        confidences = {level.name: level for level in CONFIDENCE_LEVELS}
+        for msgid, line, location, args, confidence, col_offset, \
+                end_lineno, end_col_offset in messages:
+            node = None if location is None else _find_node(module, location)
+            if isinstance(args, list):
+                args = tuple(args)
+            self.linter.add_message(msgid, line=line, node=node, args=args,
+                                    confidence=confidences.get(confidence),
+                                    col_offset=col_offset,
+                                    end_lineno=end_lineno,
+                                    end_col_offset=end_col_offset)
+
+
+class CachedResultsMixin(object):
+    """Mixin of the checkers whose messages are stored in a ResultCache"""
+
+    result_cache = None
+
+    def open(self):
+        super(CachedResultsMixin, self).open()
+        if self.result_cache is not None and self.result_cache.enabled:
+            self.result_cache.reset()
+            self.result_cache.attach(self)
+
+    def close(self):
+        super(CachedResultsMixin, self).close()
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def add_message(self, msgid, line=None, node=None, args=None,
+                    confidence=None, col_offset=None, end_lineno=None,
+                    end_col_offset=None):
+        if self.result_cache is not None:
+            self.result_cache.record(msgid, line, node, args, confidence,
+                                     col_offset, end_lineno, end_col_offset)
+        super(CachedResultsMixin, self).add_message(
+            msgid, line, node, args, confidence, col_offset, end_lineno,
+            end_col_offset)
+
+
+class ResultCacheChecker(BaseChecker):
+    """Holds the options of the cache of the messages of the CNES checkers"""
+
+    name = 'resultcache'
+    msgs = {}
+    options = (('result-cache-dir',
+                {'default': '', 'type': 'string', 'metavar': '<directory>',
+                 'help': 'Directory where the messages of the CNES checkers '
+                         'are cached by module, to be replayed when neither '
+                         'the module nor its imports changed. Disabled when '
+                         'empty, or when metrics or McCabe graphs are '
+                         'exported'}),
+              )
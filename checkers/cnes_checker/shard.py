@@ -0,0 +1,303 @@
+"""Split of the files to lint into shards of balanced cost
+
+A run of `cnes-lint --shard=K/N` on a list of files lints the K-th of N
+shards of the list, the shards being balanced by the time linting each file
+took before, as recorded in the `lint-history` file, or else by its size.
+Every node of a CI is given the same list and history, and writes its results
+with `--shard-output`; `cnes-lint --merge-shards` then reports the results of
+all the shards as a single run on the whole list would.
+
+The result files are JSON, as they come from CI artifacts: what they hold is
+checked on loading, and the messages, statistics and map data of the
+checkers are rebuilt from it.
+"""
+import collections
+import json
+import os
+
+from pylint.checkers.symilar import LineSet, LineSpecifs
+from pylint.constants import MSG_TYPES
+from pylint.interfaces import CONFIDENCE_LEVELS
+from pylint.message import Message
+from pylint.typing import MessageLocationTuple
+from pylint.utils import LinterStats
+
+
+def parse_shard(value):
+    """Return the index, from 0, and the number of shards of `value`, as
+    `K/N` with K from 1 to N, or None if empty
+    """
+    if not value:
+        return None
+    index, _, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f'invalid shard {value!r}, expected K/N') from None
+    if not 0 < index <= count:
+        raise ValueError(f'invalid shard {value!r}, expected 0 < K <= N')
+    return index - 1, count
+
+
+def history_key(path):
+    """Return the key of file `path` in the history"""
+    return os.path.relpath(path).replace(os.sep, '/')
+
+
+def load_history(path):
+    """Return the lint times by file recorded in the history file `path`"""
+    try:
+        with open(path, encoding='utf-8') as stream:
+            history = json.load(stream)
+    except (OSError, ValueError):
+        return {}
+    return history if isinstance(history, dict) else {}
+
+
+def save_history(path, times):
+    """Record the lint times `times`, by file path, in the history file"""
+    history = load_history(path)
+    history.update((history_key(filepath), round(elapsed, 4))
+                   for filepath, elapsed in times)
+    temporary = f'{path}.{os.getpid()}'
+    with open(temporary, 'w', encoding='utf-8') as stream:
+        json.dump(history, stream, indent=0, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def costs(paths, history):
+    """Return the estimated lint times of `paths`: the recorded ones, or the
+    size of the files scaled by the recorded time per byte
+    """
+    sizes = [_size(path) for path in paths]
+    times = [history.get(history_key(path)) for path in paths]
+    known = [(time, size) for time, size in zip(times, sizes)
+             if time is not None]
+    known_size = sum(size for _, size in known)
+    rate = sum(time for time, _ in known) / known_size if known_size else 1
+    return [size * rate if time is None else time
+            for time, size in zip(times, sizes)]
+
+
+def split(file_costs, count):
+    """Return the indices of `file_costs` in each of `count` shards, the most
+    costly first going to the least loaded shard
+    """
+    loads = [0.0] * count
+    shards = [[] for _ in range(count)]
+    order = sorted(range(len(file_costs)), key=lambda i: (-file_costs[i], i))
+    for index in order:
+        shard = min(range(count), key=lambda j: (loads[j], j))
+        loads[shard] += file_costs[index]
+        shards[shard].append(index)
+    return [sorted(shard) for shard in shards]
+
+
+CONFIDENCES = {confidence.name: confidence for confidence in CONFIDENCE_LEVELS}
+
+
+def _check(condition, what):
+    if not condition:
+        raise ValueError(f'invalid shard results: {what}')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _dump_message(message):
+    return {'msg_id': message.msg_id, 'symbol': message.symbol,
+            'msg': message.msg, 'confidence': message.confidence.name,
+            **message.location._asdict()}
+
+
+def _load_message(data):
+    _check(isinstance(data, dict), 'message')
+    location = {}
+    for field in MessageLocationTuple._fields:
+        value = data.get(field)
+        if field in ('line', 'column'):
+            _check(isinstance(value, int), f'message {field}')
+        elif field in ('end_line', 'end_column'):
+            _check(value is None or isinstance(value, int),
+                   f'message {field}')
+        else:
+            _check(isinstance(value, str), f'message {field}')
+        location[field] = value
+    for field in ('msg_id', 'symbol', 'msg'):
+        _check(isinstance(data.get(field), str), f'message {field}')
+    _check(data['msg_id'][:1] in MSG_TYPES, 'message msg_id')
+    confidence = CONFIDENCES.get(data.get('confidence'))
+    _check(confidence is not None, 'message confidence')
+    return Message(data['msg_id'], data['symbol'],
+                   MessageLocationTuple(**location), data['msg'], confidence)
+
+
+def _dump_stats(stats):
+    data = dict(vars(stats))
+    data['dependencies'] = {module: sorted(importers) for module, importers
+                            in stats.dependencies.items()}
+    return data
+
+
+def _load_stats(data):
+    _check(isinstance(data, dict), 'statistics')
+    stats = LinterStats()
+    for name, default in vars(stats).items():
+        value = data.get(name)
+        if isinstance(default, dict):
+            _check(isinstance(value, dict)
+                   and all(isinstance(key, str) for key in value),
+                   f'statistics {name}')
+        else:
+            _check(_is_number(value), f'statistics {name}')
+        setattr(stats, name, value)
+    for counts in (stats.bad_names, stats.by_msg, stats.code_type_count,
+                   stats.duplicated_lines, stats.node_count,
+                   stats.undocumented, *stats.by_module.values()):
+        _check(isinstance(counts, dict)
+               and all(_is_number(count) for count in counts.values()),
+               'statistics counts')
+    for importers in stats.dependencies.values():
+        _check(isinstance(importers, list)
+               and all(isinstance(importer, str) for importer in importers),
+               'statistics dependencies')
+    stats.dependencies = {module: set(importers) for module, importers
+                          in stats.dependencies.items()}
+    return stats
+
+
+def _dump_linesets(linesets):
+    return [[lineset.name, lineset.real_lines,
+             [list(line) for line in lineset.stripped_lines]]
+            for lineset in linesets]
+
+
+def _load_linesets(data):
+    _check(isinstance(data, list), 'similarities')
+    linesets = []
+    for item in data:
+        _check(isinstance(item, list) and len(item) == 3
+               and isinstance(item[0], str) and isinstance(item[1], list)
+               and all(isinstance(line, str) for line in item[1])
+               and isinstance(item[2], list)
+               and all(isinstance(line, list) and len(line) == 2
+                       and isinstance(line[0], int)
+                       and isinstance(line[1], str) for line in item[2]),
+               'similarities')
+        # the lines were stripped by the shard, with the pragmas of the file
+        lineset = LineSet(item[0], [])
+        # pylint: disable=protected-access
+        lineset._real_lines = item[1]
+        lineset._stripped_lines = [LineSpecifs(*line) for line in item[2]]
+        linesets.append(lineset)
+    return linesets
+
+
+def _dump_graphs(graphs):
+    return [{module: sorted(imported) for module, imported in graph.items()}
+            for graph in graphs]
+
+
+def _load_graphs(data):
+    _check(isinstance(data, list) and len(data) == 2, 'imports')
+    graphs = []
+    for graph in data:
+        _check(isinstance(graph, dict)
+               and all(isinstance(imported, list)
+                       and all(isinstance(module, str) for module in imported)
+                       for imported in graph.values()), 'imports')
+        graphs.append(collections.defaultdict(set, (
+            (module, set(imported)) for module, imported in graph.items())))
+    return tuple(graphs)
+
+
+def _load_profile(data):
+    _check(isinstance(data, list) and len(data) == 2
+           and isinstance(data[0], dict) and isinstance(data[1], list)
+           and all(isinstance(counts, list) and len(counts) == 3
+                   and all(_is_number(count) for count in counts)
+                   for counts in data[0].values())
+           and all(isinstance(event, dict) for event in data[1]),
+           'profile')
+    return tuple(data)
+
+
+# (dump, load) of the map data of the checkers, by checker name
+MAP_DATA = {'similarities': (_dump_linesets, _load_linesets),
+            'imports': (_dump_graphs, _load_graphs),
+            'profile': (list, _load_profile)}
+
+
+def _dump_result(result):
+    index, module, filepath, base_name, messages, stats, msg_status, \
+        map_data, elapsed = result
+    return {'index': index, 'module': module, 'filepath': filepath,
+            'base_name': base_name,
+            'messages': [_dump_message(message) for message in messages],
+            'stats': _dump_stats(stats), 'msg_status': msg_status,
+            'map_data': {name: MAP_DATA[name][0](data)
+                         for name, data in map_data.items()
+                         if name in MAP_DATA},
+            'elapsed': elapsed}
+
+
+def _load_result(data):
+    _check(isinstance(data, dict), 'result')
+    _check(isinstance(data.get('index'), int) and data['index'] >= 0,
+           'result index')
+    for field in ('module', 'filepath', 'base_name'):
+        _check(isinstance(data.get(field), str), f'result {field}')
+    _check(isinstance(data.get('messages'), list), 'result messages')
+    _check(isinstance(data.get('msg_status'), int), 'result msg_status')
+    _check(_is_number(data.get('elapsed')), 'result elapsed')
+    map_data = data.get('map_data')
+    _check(isinstance(map_data, dict)
+           and all(name in MAP_DATA for name in map_data), 'result map_data')
+    return (data['index'], data['module'], data['filepath'],
+            data['base_name'],
+            [_load_message(message) for message in data['messages']],
+            _load_stats(data.get('stats')), data['msg_status'],
+            {name: MAP_DATA[name][1](value)
+             for name, value in map_data.items()},
+            data['elapsed'])
+
+
+def save_results(path, total, results):
+    """Write the `results` of a shard of `total` files to file `path`"""
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump({'total': total,
+                   'results': [_dump_result(result) for result in results]},
+                  stream)
+
+
+def load_results(paths):
+    """Return the number of files of the whole list and the results read
+    from the shard files `paths`, in the order of the files of the list
+    """
+    results = {}
+    totals = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as stream:
+            content = json.load(stream)
+        _check(isinstance(content, dict)
+               and isinstance(content.get('total'), int)
+               and isinstance(content.get('results'), list), path)
+        totals.add(content['total'])
+        for result in content['results']:
+            result = _load_result(result)
+            results[result[0]] = result
+    if len(totals) > 1:
+        raise ValueError('the shards were split from different file lists')
+    total = totals.pop() if totals else 0
+    if total != len(results) or any(index >= total for index in results):
+        raise ValueError(f'the results of {total - len(results)} files are '
+                         f'missing')
+    return total, [results[index] for index in sorted(results)]
@@ -0,0 +1,131 @@
+"""Snapshots of the astroid trees built from source files
+
+Parsing a file and rebuilding its astroid tree is redone for every module on
+every run, for the checked modules as well as for the modules inference goes
+into (`os`, `threading`...). When `snapshot-dir` is set, the trees are pickled
+to that directory as built from the source, before the transforms of astroid
+are applied, and later runs load them instead of parsing the files again. The
+transforms, which may register functions and reference other modules, are run
+on the loaded trees as on freshly built ones. Modules built by introspection
+(`sys`, `_io`...) are not parsed, hence not concerned.
+
+Snapshots are keyed by the file content, module name and path, and the Python
+and astroid versions. They are pickles: the directory must be trusted.
+"""
+import gc
+import hashlib
+import os
+import pickle
+import sys
+
+import astroid
+from astroid.builder import AstroidBuilder
+from pylint.checkers import BaseChecker
+
+
+class _RebuilderState(object):
+    """What AstroidBuilder needs from the rebuilder to finish a tree"""
+
+    def __init__(self, import_from_nodes, delayed_assattr):
+        self._import_from_nodes = import_from_nodes
+        self._delayed_assattr = delayed_assattr
+
+
+class SnapshotStore(object):
+    """Directory of pickled astroid trees"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _filename(self, data, modname, path):
+        digest = hashlib.sha256()
+        for part in (sys.version, astroid.__version__, modname,
+                     os.path.abspath(path), data):
+            digest.update(part.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\0')
+        return os.path.join(self.directory, f'{digest.hexdigest()}.pickle')
+
+    def load(self, data, modname, path):
+        """Return the module and rebuilder state stored for source `data`,
+        or None
+        """
+        enabled = gc.isenabled()
+        # the many objects created would trigger useless collections
+        gc.disable()
+        try:
+            with open(self._filename(data, modname, path), 'rb') as stream:
+                module, import_from_nodes, delayed_assattr = \
+                    pickle.load(stream)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError,
+                AttributeError, ImportError):
+            self.misses += 1
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+        self.hits += 1
+        return module, _RebuilderState(import_from_nodes, delayed_assattr)
+
+    def save(self, data, modname, path, module, rebuilder):
+        """Store `module` built from source `data`, not transformed yet"""
+        try:
+            content = pickle.dumps((module, rebuilder._import_from_nodes,
+                                    rebuilder._delayed_assattr),
+                                   protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError,
+                AttributeError):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        filename = self._filename(data, modname, path)
+        temporary = f'{filename}.{os.getpid()}'
+        with open(temporary, 'wb') as stream:
+            stream.write(content)
+        os.replace(temporary, filename)
+
+
+_data_build = AstroidBuilder._data_build
+_store = None
+
+
+def _snapshot_data_build(builder, data, modname, path):
+    """AstroidBuilder._data_build going through the snapshot store"""
+    if _store is None or path is None:
+        return _data_build(builder, data, modname, path)
+    snapshot = _store.load(data, modname, path)
+    if snapshot is not None:
+        return snapshot
+    module, rebuilder = _data_build(builder, data, modname, path)
+    _store.save(data, modname, path, module, rebuilder)
+    return module, rebuilder
+
+
+def configure(directory):
+    """Load and store the trees built from files in `directory`, or stop
+    doing so if it is empty; return the store in use
+    """
+    global _store
+    if not directory:
+        _store = None
+        AstroidBuilder._data_build = _data_build
+        return None
+    if _store is None or _store.directory != directory:
+        _store = SnapshotStore(directory)
+    AstroidBuilder._data_build = _snapshot_data_build
+    return _store
+
+
+class SnapshotChecker(BaseChecker):
+    """Holds the options of the astroid snapshot store"""
+
+    name = 'snapshots'
+    msgs = {}
+    options = (('snapshot-dir',
+                {'default': '', 'type': 'string', 'metavar': '<directory>',
+                 'help': 'Directory where the astroid trees of the source '
+                         'files are stored, to be loaded by later runs '
+                         'instead of parsing the files again. The directory '
+                         'must be trusted, as the trees are pickled. Disabled '
+                         'when empty'}),
+              )
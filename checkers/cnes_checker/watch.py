@@ -0,0 +1,241 @@
+"""Watch mode linting the python files of a tree as they change
+
+::
+
+    cnes-lint --watch src [pylint options]
+
+lints the python files of the directory, then waits for them to change and
+lints again the changed files and the files importing them, directly or
+through other files of the tree. The messages are
+kept by file, and only the differences are printed: `+` for new messages,
+`-` for the ones which disappeared. Changes are watched with inotify on
+Linux, otherwise by polling the modification times of the files. The modules
+built by astroid are kept between runs as by the daemon.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from pylint.lint import Run
+from pylint.reporters import CollectingReporter
+
+from .cli import imported_names, module_name
+from .client import PYLINT_ARGS
+from .daemon import WarmCache
+
+
+def source_files(root):
+    """Return the python files under directory `root`, hidden ones excluded
+    """
+    paths = set()
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories
+                             if not name.startswith('.')]
+        paths.update(os.path.abspath(os.path.join(directory, name))
+                     for name in filenames if name.endswith('.py'))
+    return paths
+
+
+class PollingWatcher(object):
+    """Watches a tree by comparing the modification times of its files"""
+
+    def __init__(self, root, interval=0.5):
+        self.root = root
+        self.interval = interval
+        self._mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        for path in source_files(self.root):
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def wait(self):
+        """Return the python files created, modified or deleted, once some
+        are
+        """
+        while True:
+            time.sleep(self.interval)
+            mtimes = self._scan()
+            changed = {path for path in mtimes.keys() | self._mtimes.keys()
+                       if mtimes.get(path) != self._mtimes.get(path)}
+            self._mtimes = mtimes
+            if changed:
+                return changed
+
+
+class InotifyWatcher(object):
+    """Watches a tree with the inotify API of Linux"""
+
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_ISDIR = 0x40000000
+    MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+            | IN_DELETE | IN_DELETE_SELF)
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, root, delay=0.1):
+        self.root = root
+        self.delay = delay
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'),
+                                 use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._directories = {}
+        for directory, subdirectories, _ in os.walk(root):
+            subdirectories[:] = [name for name in subdirectories
+                                 if not name.startswith('.')]
+            self._add(directory)
+
+    def _add(self, directory):
+        descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), self.MASK)
+        if descriptor >= 0:
+            self._directories[descriptor] = directory
+
+    def _read(self, changed):
+        data = os.read(self._fd, 65536)
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            directory = self._directories.get(descriptor)
+            if directory is None or not name:
+                if mask & self.IN_DELETE_SELF:
+                    self._directories.pop(descriptor, None)
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) \
+                        and not name.startswith('.'):
+                    # the files may have been created before the watch
+                    for subdirectory, _, _ in os.walk(path):
+                        self._add(subdirectory)
+                    changed.update(source_files(path))
+            elif name.endswith('.py'):
+                changed.add(os.path.abspath(path))
+
+    def wait(self):
+        """Return the python files created, modified or deleted, once some
+        are
+        """
+        changed = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            self._read(changed)
+            # an editor saving several files, or a checkout
+            while select.select([self._fd], [], [], self.delay)[0]:
+                self._read(changed)
+        return changed
+
+
+def watcher(root):
+    """Return an inotify watcher of `root` if available, else a polling one
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def format_message(message):
+    """Return the line printed for pylint `message`"""
+    return (f'{os.path.relpath(message.abspath)}:{message.line}:'
+            f'{message.column}: {message.msg_id}: {message.msg} '
+            f'({message.symbol})')
+
+
+class Watch(object):
+    """Messages of the python files of a tree, kept up to date"""
+
+    def __init__(self, root, pylint_args, output=sys.stdout):
+        self.root = root
+        self.pylint_args = list(pylint_args)
+        self.output = output
+        self.results = {}
+        self.imports = {}
+        self.warm_cache = WarmCache()
+
+    def _update_imports(self, path):
+        try:
+            with open(path, 'rb') as stream:
+                source = stream.read()
+        except OSError:
+            self.imports.pop(path, None)
+            return
+        self.imports[path] = imported_names(source, path, module_name(path))
+
+    def affected(self, changed):
+        """Return the files of `changed` and the files importing them,
+        directly or not, as the inferences may go through the importers
+        """
+        for path in changed:
+            self._update_imports(path)
+        affected = set(changed)
+        modules = {module_name(path) for path in changed}
+        while modules:
+            importers = {path for path, names in self.imports.items()
+                         if names & modules} - affected
+            affected |= importers
+            modules = {module_name(path) for path in importers}
+        return affected
+
+    def lint(self, paths):
+        """Lint `paths` and print the changes of their messages"""
+        started = time.time_ns()
+        self.warm_cache.invalidate()
+        reporter = CollectingReporter()
+        existing = sorted(path for path in paths if os.path.isfile(path))
+        if existing:
+            Run(PYLINT_ARGS + self.pylint_args + existing, reporter=reporter,
+                exit=False)
+        self.warm_cache.record(started)
+        messages = {path: set() for path in paths}
+        for message in reporter.messages:
+            messages.setdefault(message.abspath, set()).add(
+                format_message(message))
+        for path in sorted(messages):
+            previous = self.results.pop(path, set())
+            current = messages[path]
+            for line in sorted(previous - current):
+                self.output.write(f'- {line}\n')
+            for line in sorted(current - previous):
+                self.output.write(f'+ {line}\n')
+            if current:
+                self.results[path] = current
+        self.output.flush()
+
+    def run(self, watcher_factory=watcher):
+        """Lint the tree, then the changes until interrupted"""
+        files = source_files(self.root)
+        for path in files:
+            self._update_imports(path)
+        changes = watcher_factory(self.root)
+        self.lint(files)
+        while True:
+            self.lint(self.affected(changes.wait()))
+
+
+def watch(root, pylint_args):
+    """Lint the python files of `root` as they change, until interrupted"""
+    try:
+        Watch(root, pylint_args).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -22,8 +22,15 @@ setuptools.setup(
     python_requires='>=3.8',
     install_requires=[
         "pylint-plugin-utils==0.7",
-        "pylint>=3.0.0,<4.0.0"
+        "pylint>=3.0.0,<4.0.0",
+        "astroid>=3.0.0,<4.0.0",
+        "dill>=0.3.6"
     ],
+    entry_points={
+        'console_scripts': ['cnes-lint=cnes_checker.cli:main',
+                            'cnes-lintd=cnes_checker.daemon:main',
+                            'cnes-lintc=cnes_checker.client:main'],
+    },
     project_urls={
         'Bug Reports': 'https://github.com/cnescatlab/cnes-pylint-extension/issues'
     }
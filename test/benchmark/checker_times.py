@@ -0,0 +1,52 @@
+"""Time the CNES checkers, in isolation and together
+
+Lint the given files or packages once per CNES checker with only its
+messages enabled, once with all of them and once with none of them (the
+cost of parsing and walking the modules), and print the best wall times
+over several rounds. `sphinxdoc` also emits the docparams messages it
+inherits, `sphinxdoc (CNES)` only its own ones::
+
+    python test/benchmark/checker_times.py /usr/lib/python3.11/email
+"""
+import gc
+import sys
+import time
+
+from common import CHECKER_NAMES, make_linter
+
+CONFIGURATIONS = [('(no checker)', (), ())]
+CONFIGURATIONS += [(name, (name,), ()) for name in CHECKER_NAMES]
+CONFIGURATIONS += [('sphinxdoc (CNES)', (),
+                    ('missing-docstring-field', 'malformed-docstring-field',
+                     'missing-docstring-description'))]
+CONFIGURATIONS += [('all', CHECKER_NAMES, ())]
+
+
+def time_checkers(paths, checker_names, messages=()):
+    """Return the wall time of a lint of `paths` by `checker_names` and
+    `messages`
+    """
+    linter = make_linter(checker_names, messages)
+    gc.collect()
+    start = time.perf_counter()
+    linter.check(paths)
+    return time.perf_counter() - start
+
+
+def main(paths, rounds=5):
+    """Print the times of the CNES checkers on `paths`"""
+    # warm astroid's caches up before timing anything
+    time_checkers(paths, CHECKER_NAMES)
+    times = {}
+    for _ in range(rounds):
+        for label, checker_names, messages in CONFIGURATIONS:
+            elapsed = time_checkers(paths, checker_names, messages)
+            times[label] = min(times.get(label, elapsed), elapsed)
+    baseline = times['(no checker)']
+    for label, _, _ in CONFIGURATIONS:
+        print(f'{times[label]:8.3f}s {label:16s} '
+              f'{times[label] - baseline:+.3f}s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
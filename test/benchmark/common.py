@@ -0,0 +1,33 @@
+"""Helpers shared by the benchmark scripts"""
+import os
+import sys
+
+from pylint import lint
+from pylint.reporters import CollectingReporter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, os.pardir, 'checkers'))
+
+from cnes_checker import cnes_checker  # pylint: disable=wrong-import-position
+
+CHECKER_NAMES = ('design', 'commentmetrics', 'mccabe', 'sphinxdoc',
+                 'forbiddenusage')
+
+
+def make_linter(checker_names=CHECKER_NAMES, messages=()):
+    """Return a linter emitting the messages of the given CNES checkers and
+    the given `messages` only
+    """
+    linter = lint.PyLinter()
+    linter.set_reporter(CollectingReporter())
+    linter.load_default_plugins()
+    linter.load_plugin_modules(['cnes_checker'])
+    linter.disable('all')
+    for checker in linter.get_checkers():
+        if (checker.__module__ == cnes_checker.__name__
+                and checker.name in checker_names):
+            for message in checker.messages:
+                linter.enable(message.msgid)
+    for message in messages:
+        linter.enable(message)
+    return linter
@@ -0,0 +1,211 @@
+"""Synthetic modules exercising the CNES checkers
+
+`synthetic_module` generates a module of a number of functions of given
+nesting depth, call density, docstring size, comment density and decorator
+count; `FIXTURES` generates modules shaped as real ones: a command line
+script, a class hierarchy and a module of closures. The modules are
+deterministic for a given seed, so that their timings can be compared from
+one run to the next::
+
+    python test/benchmark/corpus.py /tmp/corpus
+"""
+import os
+import random
+import sys
+
+# the blocks nesting the body of the synthetic functions, in turn
+BLOCKS = ('if first > {k}:', 'for item in range(second):',
+          'while first != {k}:', 'try:', 'with open(name) as stream:')
+
+
+def _docstring(indent, lines, parameters):
+    """Return the lines of a sphinx docstring of `lines` lines"""
+    result = [f'{indent}"""Compute the value of the synthetic function']
+    if lines:
+        result.append('')
+        for index in range(lines):
+            parameter = parameters[index % len(parameters)] \
+                if parameters else 'value'
+            result.append(f'{indent}:param {parameter}: the value number '
+                          f'{index} of the computation')
+        result.append(f'{indent}:returns: the computed value')
+    result.append(f'{indent}"""')
+    return result
+
+
+def _body(random_, indent, depth, calls, comments, callees):
+    """Return the lines of a function body nesting `depth` blocks"""
+    lines = []
+    for level in range(depth):
+        block = BLOCKS[level % len(BLOCKS)]
+        if random_.random() < comments:
+            lines.append(f'{indent}# nesting level {level}')
+        lines.append(indent + block.format(k=level))
+        indent += '    '
+        if block == 'try:':
+            lines.append(f'{indent}first += {level}')
+            lines.append(f'{indent[4:]}except ValueError:')
+            lines.append(f'{indent}first = 0')
+            lines.append(f'{indent[4:]}else:')
+        elif block.startswith('while'):
+            lines.append(f'{indent}first += 1')
+    for index in range(calls):
+        if random_.random() < comments:
+            lines.append(f'{indent}# call number {index}')
+        callee = random_.choice(callees) if callees else 'max'
+        lines.append(f'{indent}second = {callee}(first, second)')
+    lines.append(f'{indent}name = str(second)')
+    return lines
+
+
+def synthetic_module(functions=50, depth=2, calls=3, docstring=2,
+                     comments=0.2, decorators=0, seed=0):
+    """Return the source of a module of `functions` functions nesting `depth`
+    blocks, making `calls` calls to the other functions, documented by
+    `docstring` field lines, commented with the probability `comments` per
+    statement and decorated `decorators` times
+    """
+    random_ = random.Random(seed)
+    lines = ['"""Synthetic module"""', 'import functools', '', '',
+             'def decorate(function):',
+             '    """Return `function` wrapped"""',
+             '    @functools.wraps(function)',
+             '    def wrapper(*args, **kwargs):',
+             '        """Call `function`"""',
+             '        return function(*args, **kwargs)',
+             '    return wrapper']
+    names = []
+    for index in range(functions):
+        name = f'function_{index}'
+        lines += ['', '']
+        lines += ['@decorate'] * decorators
+        lines.append(f'def {name}(first, second):')
+        lines += _docstring('    ', docstring, ('first', 'second'))
+        lines.append('    name = __file__')
+        # the calls to the function itself are recursive calls
+        lines += _body(random_, '    ', depth, calls, comments,
+                       names[-10:] + [name])
+        lines.append('    return first + second')
+        names.append(name)
+    return '\n'.join(lines) + '\n'
+
+
+def script_module(commands=30, seed=0):
+    """Return the source of a command line script of `commands` commands"""
+    random_ = random.Random(seed)
+    lines = ['"""Synthetic command line script"""', 'import argparse',
+             'import os', 'import sys', '']
+    for index in range(commands):
+        lines += ['', f'def command_{index}(args):',
+                  f'    """Run command {index}"""',
+                  f"    home = os.environ.get('HOME_{index}', '.')",
+                  '    if not os.path.isdir(home):',
+                  "        print('no such directory', file=sys.stderr)",
+                  '        return 1']
+        if random_.random() < 0.3:
+            lines += ['    if len(sys.argv) > 3:', '        sys.exit(2)']
+        lines += ['    for name in sorted(os.listdir(home)):',
+                  '        if name.startswith(args.prefix):',
+                  '            print(os.path.join(home, name))',
+                  '    return 0']
+    lines += ['', '', 'def main():', '    """Run the given command"""',
+              '    parser = argparse.ArgumentParser()',
+              "    parser.add_argument('command', type=int)",
+              "    parser.add_argument('--prefix', default='')",
+              '    args = parser.parse_args()',
+              "    return globals()[f'command_{args.command}'](args)", '', '',
+              "if __name__ == '__main__':", '    sys.exit(main())']
+    return '\n'.join(lines) + '\n'
+
+
+def classes_module(classes=20, methods=8, seed=0):
+    """Return the source of a hierarchy of `classes` classes of `methods`
+    methods each
+    """
+    random_ = random.Random(seed)
+    lines = ['"""Synthetic class hierarchy"""', '', '',
+             'class Base(object):', '    """Root of the hierarchy"""', '',
+             '    def __init__(self, value):',
+             '        """Initialize the instance"""',
+             '        self.value = value', '        self.children = []']
+    for index in range(classes):
+        parent = f'Class{random_.randrange(index)}' if index else 'Base'
+        lines += ['', '', f'class Class{index}({parent}):',
+                  f'    """Class number {index}"""']
+        for method in range(methods):
+            lines += ['', f'    def method_{method}(self, other):']
+            lines += _docstring('        ', 2, ('other',))
+            lines += ['        total = self.value',
+                      '        for child in self.children:',
+                      f'            total += child.method_{method}(other)',
+                      '        if isinstance(other, Base):',
+                      '            total += other.value',
+                      '        return total']
+        lines += ['', '    @property', '    def size(self):',
+                  '        """Number of children"""',
+                  '        return len(self.children)']
+    return '\n'.join(lines) + '\n'
+
+
+def closures_module(functions=30, depth=3):
+    """Return the source of `functions` functions nesting `depth` closures,
+    the innermost ones calling the outer ones
+    """
+    lines = ['"""Synthetic closures"""']
+    for index in range(functions):
+        lines += ['', '', f'def outer_{index}(value):',
+                  '    """Return the closure of `value`"""']
+        indent = '    '
+        names = [f'outer_{index}']
+        for level in range(depth):
+            name = f'inner_{level}'
+            lines += [f'{indent}def {name}(count):',
+                      f'{indent}    """Level {level}"""',
+                      f'{indent}    if count > {level}:',
+                      f'{indent}        return {names[-1]}(count - 1)']
+            names.append(name)
+            indent += '    '
+        lines.append(f'{indent}return value')
+        for level in reversed(range(depth)):
+            indent = indent[4:]
+            lines.append(f'{indent}return inner_{level}')
+    return '\n'.join(lines) + '\n'
+
+
+# modules shaped as real ones
+FIXTURES = {
+    'script': script_module,
+    'classes': classes_module,
+    'closures': closures_module,
+}
+
+# parameters of the synthetic modules, each varying one of them
+SYNTHETIC = {
+    'functions': {'functions': 200},
+    'depth': {'functions': 50, 'depth': 8},
+    'calls': {'functions': 50, 'calls': 30},
+    'docstrings': {'functions': 50, 'docstring': 30},
+    'comments': {'functions': 50, 'calls': 10, 'comments': 1.0},
+    'decorators': {'functions': 50, 'decorators': 5},
+}
+
+
+def write_corpus(directory):
+    """Write the synthetic modules and the fixtures to `directory`; return
+    their paths by name
+    """
+    sources = {name: synthetic_module(**parameters)
+               for name, parameters in SYNTHETIC.items()}
+    sources.update((name, generate()) for name, generate in FIXTURES.items())
+    paths = {}
+    for name, source in sources.items():
+        paths[name] = os.path.join(directory, f'corpus_{name}.py')
+        with open(paths[name], 'w', encoding='utf-8') as stream:
+            stream.write(source)
+    return paths
+
+
+if __name__ == '__main__':
+    os.makedirs(sys.argv[1], exist_ok=True)
+    for path in write_corpus(sys.argv[1]).values():
+        print(path)
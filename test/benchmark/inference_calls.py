@@ -0,0 +1,76 @@
+"""Count the astroid inferences run by the CNES checkers
+
+Lint the given files or packages with only the CNES messages enabled and
+report how many times the checkers called `infer()` for each module and
+from each checker method::
+
+    python test/benchmark/inference_calls.py /usr/lib/python3.11/email
+"""
+import collections
+import sys
+
+from astroid import nodes
+
+from common import cnes_checker, make_linter
+
+
+def qualified_name(frame):
+    """Return the name of the function of `frame`, qualified by the class of
+    its `self` if it is a method (co_qualname requires Python 3.11)
+    """
+    instance = frame.f_locals.get('self')
+    if instance is None:
+        return frame.f_code.co_name
+    return f'{type(instance).__name__}.{frame.f_code.co_name}'
+
+
+def count_inferences(linter, paths):
+    """Lint `paths`, return the number of CNES inferences per module and
+    per calling method
+    """
+    counts = collections.Counter()
+    callers = collections.Counter()
+    infer = nodes.NodeNG.infer
+
+    def counting_infer(node, *args, **kwargs):
+        # pylint: disable=protected-access
+        frame = sys._getframe(1)
+        while qualified_name(frame) in ('InferenceCache.infer',
+                                        'InferenceCache._infer'):
+            frame = frame.f_back
+        if frame.f_code.co_filename == cnes_checker.__file__:
+            counts[linter.current_name] += 1
+            callers[qualified_name(frame)] += 1
+        return infer(node, *args, **kwargs)
+
+    nodes.NodeNG.infer = counting_infer
+    try:
+        linter.check(paths)
+    finally:
+        nodes.NodeNG.infer = infer
+    return counts, callers
+
+
+def main(paths):
+    """Print the inference counts of the modules in `paths`"""
+    linter = make_linter()
+    counts, callers = count_inferences(linter, paths)
+    for module, count in sorted(counts.items()):
+        print(f'{count:8d} {module}')
+    print()
+    for caller, count in callers.most_common():
+        print(f'{count:8d} {caller}')
+    print()
+    for checker in linter.get_checkers():
+        cache = getattr(checker, 'inference_cache', None)
+        if cache is not None:
+            print(f'{cache.hits:8d} inference cache hits, '
+                  f'{cache.misses} misses, {cache.exceeded} over budget')
+            break
+    modules = len(linter.stats.by_module) or 1
+    print(f'{sum(counts.values()):8d} inferences in {modules} modules '
+          f'({sum(counts.values()) / modules:.1f} per module)')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,83 @@
+"""Fit the growth of the cost of the CNES checkers with the size of modules
+
+Lint modules of 1, 2, 4 and 8 times as many functions, as deep nestings of
+blocks and as deep nestings of closures, with each CNES checker in isolation,
+and fit the exponent of the growth of the time spent in its callbacks: about
+1 for a linear checker, 2 for a quadratic one::
+
+    python test/benchmark/scaling.py
+"""
+import math
+import os
+import tempfile
+
+from checker_times import CONFIGURATIONS
+from common import CHECKER_NAMES
+from corpus import closures_module, synthetic_module
+from suite import time_lint
+
+SCALES = (1, 2, 4, 8)
+
+# source of the module of each dimension at a given scale
+DIMENSIONS = {
+    'functions': lambda scale: synthetic_module(functions=25 * scale,
+                                                calls=5),
+    'depth': lambda scale: synthetic_module(functions=20, depth=2 * scale,
+                                            calls=5),
+    'closures': lambda scale: closures_module(functions=20, depth=2 * scale),
+}
+
+
+def fit_exponent(scales, costs):
+    """Return the slope of the least squares fit of log(costs) by
+    log(scales)
+    """
+    xs = [math.log(scale) for scale in scales]
+    ys = [math.log(max(cost, 1e-6)) for cost in costs]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+            / sum((x - mean_x) ** 2 for x in xs))
+
+
+def scaling_costs(dimension, rounds=3):
+    """Return the best callback times of each CNES checker in isolation on
+    the modules of `dimension` at each scale
+    """
+    configurations = [configuration for configuration in CONFIGURATIONS
+                      if configuration[0] in CHECKER_NAMES]
+    costs = {label: [None] * len(SCALES) for label, _, _ in configurations}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for scale in SCALES:
+            paths.append(os.path.join(directory,
+                                      f'scaling_{dimension}_{scale}.py'))
+            with open(paths[-1], 'w', encoding='utf-8') as stream:
+                stream.write(DIMENSIONS[dimension](scale))
+        for _ in range(rounds):
+            for index, path in enumerate(paths):
+                for label, checker_names, messages in configurations:
+                    _, cost = time_lint(path, checker_names, messages)
+                    best = costs[label][index]
+                    costs[label][index] = cost if best is None \
+                        else min(best, cost)
+    return costs
+
+
+def exponents(dimension, rounds=3):
+    """Return the growth exponent of each CNES checker along `dimension`"""
+    return {label: fit_exponent(SCALES, costs) for label, costs
+            in scaling_costs(dimension, rounds).items()}
+
+
+def main():
+    """Print the growth exponents of the CNES checkers"""
+    for dimension in DIMENSIONS:
+        print(dimension)
+        for label, costs in scaling_costs(dimension).items():
+            times = ' '.join(f'{cost:7.4f}s' for cost in costs)
+            print(f'  {fit_exponent(SCALES, costs):5.2f} {times} {label}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Time pylint runs with and without astroid snapshots
+
+Run pylint with the CNES messages in fresh processes, so that startup is
+included: without snapshots, with an empty snapshot directory (filled by the
+run) and with the filled directory. Print the best wall times over several
+rounds of a run on an empty file (the startup) and on the given files, per
+run and per checked file, and check the messages are the same::
+
+    python test/benchmark/snapshot_times.py /usr/lib/python3.11/email
+"""
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import CHECKER_NAMES, cnes_checker, make_linter
+
+CHECKERS_DIR = os.path.dirname(os.path.dirname(cnes_checker.__file__))
+
+
+def cnes_messages():
+    """Return the ids of the messages of the CNES checkers"""
+    return sorted(message.msgid for checker in make_linter().get_checkers()
+                  if checker.name in CHECKER_NAMES
+                  for message in checker.messages)
+
+
+def run_pylint(paths, snapshot_dir=None):
+    """Return the wall time and output of a pylint run on `paths`"""
+    command = [sys.executable, '-m', 'pylint', '--load-plugins=cnes_checker',
+               '--disable=all', '--enable=' + ','.join(cnes_messages()),
+               '--score=n', '--persistent=n']
+    if snapshot_dir is not None:
+        command.append(f'--snapshot-dir={snapshot_dir}')
+    environment = dict(os.environ, PYTHONPATH=CHECKERS_DIR)
+    start = time.perf_counter()
+    output = subprocess.run(command + list(paths), env=environment,
+                            capture_output=True, text=True,
+                            check=False).stdout
+    return time.perf_counter() - start, sorted(output.splitlines())
+
+
+def count_files(paths):
+    """Return the number of python files in `paths`"""
+    return sum(len(glob.glob(os.path.join(path, '**', '*.py'),
+                             recursive=True))
+               if os.path.isdir(path) else 1 for path in paths)
+
+
+def main(paths, rounds=3):
+    """Print the times of pylint runs on `paths` with and without snapshots
+    """
+    startup_times = {}
+    times = {}
+    outputs = set()
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory() as directory:
+            empty = os.path.join(directory, 'empty.py')
+            with open(empty, 'w', encoding='utf-8'):
+                pass
+            store = os.path.join(directory, 'snapshots')
+            for label, snapshot_dir in (('no snapshot', None),
+                                        ('cold snapshots', store),
+                                        ('warm snapshots', store)):
+                elapsed, _ = run_pylint([empty], snapshot_dir)
+                startup_times[label] = min(
+                    startup_times.get(label, elapsed), elapsed)
+                elapsed, output = run_pylint(paths, snapshot_dir)
+                times[label] = min(times.get(label, elapsed), elapsed)
+                outputs.add(tuple(output))
+    files = count_files(paths)
+    for label, elapsed in times.items():
+        per_file = (elapsed - startup_times[label]) / files * 1000
+        print(f'startup {startup_times[label]:6.3f}s  total {elapsed:7.3f}s  '
+              f'{per_file:7.2f}ms/file  {label}')
+    if len(outputs) != 1:
+        print('the messages differ between the runs')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
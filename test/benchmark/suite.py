@@ -0,0 +1,156 @@
+"""Time the CNES checkers on the synthetic corpus against a baseline
+
+Generate the modules of `corpus` and lint each of them with the
+configurations of `checker_times`: each CNES checker in isolation, all of
+them, and none of them. The cost of a configuration is the time spent in
+the callbacks of the CNES checkers, measured around each of them, which
+does not vary with the parsing of the module as the whole lint time does.
+The best costs over several rounds are compared with those recorded in
+`baseline.json`; a cost exceeding its baseline by more than the tolerance is
+reported as a regression, and the exit status is then 1. `--save` records
+the costs of the run as the new baseline. The costs are times, which only
+compare on the same machine: the baseline is not versioned, and is recorded
+with `--save` on the machine running the comparisons, before the changes to
+measure::
+
+    python test/benchmark/suite.py --save
+    python test/benchmark/suite.py [--rounds 5] [--tolerance 0.3]
+"""
+import argparse
+import functools
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+from checker_times import CONFIGURATIONS
+from common import cnes_checker, make_linter
+from corpus import write_corpus
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+# increases of the costs below this many seconds are noise
+MINIMUM_INCREASE = 0.005
+CALLBACK_PREFIXES = ('visit_', 'leave_', 'process_')
+
+
+def _timed(method, counter):
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            counter[0] += time.perf_counter() - start
+    return timed_method
+
+
+def time_lint(path, checker_names, messages=()):
+    """Return the wall time of a lint of `path` by `checker_names` and
+    `messages`, and the time spent in the callbacks of the CNES checkers;
+    raise RuntimeError if the lint crashed
+    """
+    # a crashing checker would look fast
+    linter = make_linter(checker_names, ('astroid-error',) + tuple(messages))
+    counter = [0.0]
+    for checker in linter.get_checkers():
+        if checker.__module__ != cnes_checker.__name__:
+            continue
+        for name in dir(checker):
+            if name.startswith(CALLBACK_PREFIXES):
+                # the wrapper keeps the messages the walker checks
+                setattr(checker, name, _timed(getattr(checker, name),
+                                              counter))
+    gc.collect()
+    start = time.perf_counter()
+    linter.check([path])
+    elapsed = time.perf_counter() - start
+    for message in linter.reporter.messages:
+        if message.symbol == 'astroid-error':
+            raise RuntimeError(message.msg)
+    return elapsed, counter[0]
+
+
+def time_corpus(rounds):
+    """Return the best wall and callback times of the configurations on each
+    corpus module
+    """
+    times = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(directory)
+        # warm astroid's caches up before timing anything
+        for path in paths.values():
+            time_lint(path, CONFIGURATIONS[-1][1])
+        for _ in range(rounds):
+            for name, path in paths.items():
+                module_times = times.setdefault(name, {})
+                for label, checker_names, messages in CONFIGURATIONS:
+                    elapsed = time_lint(path, checker_names, messages)
+                    best = module_times.get(label, elapsed)
+                    module_times[label] = [round(min(best[0], elapsed[0]), 4),
+                                           round(min(best[1], elapsed[1]), 4)]
+    return times
+
+
+def regressions(current, baseline, tolerance):
+    """Return the (module, configuration, baseline cost, cost) whose cost
+    exceeds the baseline by more than `tolerance`
+    """
+    result = []
+    for name, module_times in current.items():
+        for label, (_, cost) in module_times.items():
+            expected = baseline.get(name, {}).get(label)
+            if expected is not None and cost - expected[1] > max(
+                    expected[1] * tolerance, MINIMUM_INCREASE):
+                result.append((name, label, expected[1], cost))
+    return result
+
+
+def main(argv=None):
+    """Time the checkers on the corpus; return 1 if they regressed"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='number of timings of which the best is kept')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='relative increase of a cost reported as a '
+                             'regression')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='file of the baseline costs')
+    parser.add_argument('--save', action='store_true',
+                        help='record the costs as the baseline')
+    args = parser.parse_args(argv)
+    current = time_corpus(args.rounds)
+    try:
+        with open(args.baseline, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+    except FileNotFoundError:
+        if not args.save:
+            print(f'no baseline {args.baseline}, record one with --save',
+                  file=sys.stderr)
+        baseline = {}
+    print('    lint     cost')
+    for name, module_times in current.items():
+        print(name)
+        for label, (elapsed, cost) in module_times.items():
+            expected = baseline.get(name, {}).get(label)
+            line = f'  {elapsed:6.3f}s {cost:7.4f}s {label}'
+            if expected:
+                line = f'{line:40s}(baseline {expected[0]:.3f}s ' \
+                       f'{expected[1]:.4f}s)'
+            print(line)
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as stream:
+            json.dump(current, stream, indent=1, sort_keys=True)
+            stream.write('\n')
+        return 0
+    found = regressions(current, baseline, args.tolerance)
+    for name, label, expected, cost in found:
+        print(f'regression: {label} on {name}: {cost:.3f}s, baseline '
+              f'{expected:.3f}s')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""Check that the docparams messages follow the pragmas of the module, even
+when disabled by the configuration
+"""
+# pylint: disable=too-few-comments,missing-docstring-field
+# pylint: enable=missing-param-doc
+
+
+def func(arg, other):  # [missing-param-doc]
+    """Function
+
+    :param arg: an argument
+    :returns: the argument
+    """
+    return arg, other
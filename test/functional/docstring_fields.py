@@ -0,0 +1,30 @@
+"""Module docstring  # [malformed-docstring-field, missing-docstring-field]
+
+:author: someone
+:version:
+"""
+# pylint: disable=too-few-comments
+
+
+class Described(object):
+    """Described class"""
+
+    def method(self):  # [missing-docstring-description]
+        """:returns: nothing"""
+
+
+class Undescribed(object):  # [missing-docstring-description]
+    """
+    :author: someone
+    """
+
+
+def described():
+    """Described function
+
+    :author: someone
+    """
+
+
+def undocumented():
+    pass
@@ -0,0 +1,21 @@
+"""Check that the inferences exceeding the budget are reported, instead of the
+messages depending on them
+"""
+# pylint: disable=too-few-comments,missing-docstring-field,missing-any-param-doc
+import os
+import sys
+
+handle = open('afile.txt')  # [use-context-manager]
+
+
+def read(flag):
+    """Open the file with one of two openers"""
+    opener = open if flag else print
+    return opener('afile.txt')  # [inference-budget-exceeded]
+
+
+def leave(flag):
+    """Exit with one of two functions"""
+    stop = sys.exit if flag else os._exit
+    stop(1)  # [inference-budget-exceeded]
+    sys.exit(2)  # [sys-exit-used]
@@ -14,3 +14,15 @@ env = o.getenv()  # [os-environ-used]
 o.putenv('TOTO', 'titi')  # [os-environ-used]
 sep = o.sep
 o.unsetenv('TOTO')  # [os-environ-used]
+env2 = os.environ  # [os-environ-used]
+print(env2)  # [os-environ-used]
+
+def function2(os):
+    return os.environ
+
+def function3(env=os.environ):  # [os-environ-used]
+    return env['HOME']  # [os-environ-used]
+
+# inferred, shutil could provide os
+from shutil import *
+os.environ['HOME'] = '/'  # [os-environ-used]
@@ -1,4 +1,4 @@
-"""Check direct recursion isn't permitted
+"""Check direct and indirect recursion isn't permitted
 """
 #pylint: disable=too-few-comments,missing-docstring-field
 
@@ -19,3 +19,18 @@ def func2():
     c.func2()
 
 
+
+def func3():
+    func4()  # [recursive-call]
+
+def func4():
+    if True:
+        func3()  # [recursive-call]
+    func1()
+
+def func5(arg):
+    handler = func5 if arg else func6
+    handler(arg - 1)  # [recursive-call]
+
+def func6(arg):
+    func5(arg)  # [recursive-call]
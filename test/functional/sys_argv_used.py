@@ -15,3 +15,10 @@ if len(sys.argv > 1):  # [sys-argv-used]
     param = sys.argv[1]  # [sys-argv-used]
 
 stdout = sys.stdout
+
+def function2(args=sys.argv):  # [sys-argv-used]
+    return args[1:]  # [sys-argv-used]
+
+# inferred, shutil could provide sys, and astroid cannot infer sys.argv
+from shutil import *
+param = sys.argv[1]
@@ -27,3 +27,10 @@ if __name__ == '__something__':
 if __name__ == '__main__':
     main()
     sys.exit(1)
+
+def function(leave=sys.exit):
+    leave(9)  # [sys-exit-used]
+
+# inferred, shutil could provide sys
+from shutil import *
+sys.exit(12)  # [sys-exit-used]
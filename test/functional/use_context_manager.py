@@ -1,7 +1,7 @@
 """Check that is a file is opened without using a context manager, a refactor
 message is triggered. Same thing for threading locks.
 """
-# pylint: disable=too-few-comments,missing-docstring-field
+# pylint: disable=too-few-comments,missing-docstring-field,missing-any-param-doc
 import threading
 
 with open('afile.txt') as af:
@@ -20,3 +20,14 @@ lock.acquire()  # [use-context-manager]
 
 lock = threading.Semaphore()
 lock.acquire()  # [use-context-manager]
+
+
+def read_with(path, opener=open):
+    """Open the file with the given opener"""
+    return opener(path)  # [use-context-manager]
+
+
+def read_if(path, flag):
+    """Open the file if asked"""
+    opener = open if flag else None
+    return opener(path)  # [use-context-manager]
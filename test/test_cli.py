@@ -0,0 +1,124 @@
+"""Tests of the selection of the files changed in a git repository"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker import cli
+
+SOURCES = {
+    'pkg/__init__.py': '',
+    'pkg/base.py': 'VALUE = 1\n',
+    'pkg/relative.py': 'from . import base\n',
+    'pkg/absolute.py': 'from pkg.base import VALUE\n',
+    'pkg/gone.py': 'GONE = 1\n',
+    'gone_user.py': 'import pkg.gone\n',
+    'unrelated.py': 'import os\n',
+    # imports `base`, but another one
+    'base_user.py': 'import base\n',
+}
+
+
+class ChangedFilesTest(unittest.TestCase):
+    """Changes in a temporary git repository"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name, source in SOURCES.items():
+            self.write(name, source)
+        self.git('init', '-q')
+        self.git('add', '.')
+        self.git('-c', 'user.name=test', '-c', 'user.email=test@example.com',
+                 'commit', '-q', '-m', 'sources')
+
+    def git(self, *args):
+        """Run git command `args` in the repository"""
+        subprocess.run(('git',) + args, cwd=self.root, check=True,
+                       capture_output=True)
+
+    def write(self, name, source):
+        """Write `source` to file `name` of the repository"""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(source)
+
+    def path(self, name):
+        """Return the path of file `name` of the repository"""
+        return os.path.join(self.root, *name.split('/'))
+
+    def affected(self):
+        """Return the files to lint for the changes since the commit"""
+        return cli.affected_files(self.root, 'HEAD')
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.affected(), [])
+
+    def test_changed_file_and_importers(self):
+        self.write('pkg/base.py', 'VALUE = 2\n')
+        self.assertEqual(self.affected(),
+                         sorted(self.path(name) for name in (
+                             'pkg/base.py', 'pkg/relative.py',
+                             'pkg/absolute.py')))
+
+    def test_untracked_file(self):
+        self.write('pkg/new.py', 'NEW = 1\n')
+        self.assertEqual(self.affected(), [self.path('pkg/new.py')])
+
+    def test_deleted_file(self):
+        os.remove(self.path('pkg/gone.py'))
+        self.assertIn(self.path('pkg/gone.py'),
+                      cli.changed_files(self.root, 'HEAD'))
+        # only its importers remain to be linted
+        self.assertEqual(self.affected(), [self.path('gone_user.py')])
+
+
+class ModuleNamesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        os.makedirs(os.path.join(self.root, 'pkg', 'sub'))
+        for name in ('__init__.py', 'sub/__init__.py', 'sub/mod.py'):
+            with open(os.path.join(self.root, 'pkg', name), 'w',
+                      encoding='utf-8'):
+                pass
+
+    def test_module_name(self):
+        package = os.path.join(self.root, 'pkg')
+        self.assertEqual(cli.module_name(os.path.join(package, 'sub',
+                                                      'mod.py')),
+                         'pkg.sub.mod')
+        self.assertEqual(cli.module_name(os.path.join(package, 'sub',
+                                                      '__init__.py')),
+                         'pkg.sub')
+        self.assertEqual(cli.module_name(os.path.join(self.root, 'top.py')),
+                         'top')
+
+    def test_imported_names(self):
+        source = 'import a.b\nfrom . import c\nfrom ..d import e\n'
+        self.assertEqual(cli.imported_names(source, 'pkg/sub/mod.py',
+                                            'pkg.sub.mod'),
+                         {'a', 'a.b', 'pkg', 'pkg.sub', 'pkg.sub.c',
+                          'pkg.d', 'pkg.d.e'})
+        # the package of a package is itself
+        self.assertEqual(cli.imported_names(source, 'pkg/sub/__init__.py',
+                                            'pkg.sub'),
+                         {'a', 'a.b', 'pkg', 'pkg.sub', 'pkg.sub.c',
+                          'pkg.d', 'pkg.d.e'})
+        self.assertEqual(cli.imported_names('import (', 'bad.py', 'bad'),
+                         set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Tests of the lint daemon and of its client"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import astroid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker import client, daemon
+
+ARGS = ['--rcfile', os.devnull, '--reports=n', '--score=n', '--disable=all',
+        '--enable=sys-exit-used']
+
+
+class DaemonTestCase(unittest.TestCase):
+    """Lints of a module of a temporary directory"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.module = os.path.join(self.directory, 'daemon_module.py')
+        self.socket = os.path.join(self.directory, 'lintd.sock')
+        environ = mock.patch.dict(os.environ,
+                                  {'CNES_LINTD_SOCKET': self.socket})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def write(self, source):
+        """Write `source` to the module, dated a second after its previous
+        version, from a minute ago
+        """
+        mtime = os.stat(self.module).st_mtime_ns \
+            if os.path.exists(self.module) else time.time_ns() - 60 * 10**9
+        with open(self.module, 'w', encoding='utf-8') as stream:
+            stream.write(source)
+        os.utime(self.module, ns=(mtime + 10**9, mtime + 10**9))
+
+    def lint(self):
+        """Lint the module with cnes-lintc; return its status and output"""
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = client.main(ARGS + [self.module])
+        return status, stdout.getvalue()
+
+
+class RoundTripTest(DaemonTestCase):
+
+    def setUp(self):
+        super(RoundTripTest, self).setUp()
+        server = daemon.LintServer(self.socket)
+        thread = threading.Thread(target=server.serve_forever,
+                                  kwargs={'poll_interval': 0.05})
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+
+    def test_edit_relinted(self):
+        self.assertTrue(client.listening(self.socket))
+        self.write('"""Module"""\nimport sys\nsys.exit(1)\n')
+        status, output = self.lint()
+        # a refactor message
+        self.assertEqual(status, 8)
+        self.assertIn('sys-exit-used', output)
+        self.assertIn('daemon_module',
+                      [name for name, module
+                       in astroid.MANAGER.astroid_cache.items()
+                       if module.file == self.module])
+        self.write('"""Module"""\nimport sys\n')
+        status, output = self.lint()
+        self.assertEqual(status, 0)
+        self.assertNotIn('sys-exit-used', output)
+
+    def test_invalid_request(self):
+        answer = client.request(self.socket, ARGS + ['missing_module.py'],
+                                os.path.join(self.directory, 'missing'))
+        self.assertEqual(answer['status'], 32)
+        self.assertTrue(answer['stderr'])
+
+
+class ClientFallbackTest(DaemonTestCase):
+
+    def test_lint_in_process(self):
+        self.assertFalse(client.listening(self.socket))
+        self.assertIsNone(client.request(self.socket, [], self.directory))
+        self.write('"""Module"""\nimport sys\nsys.exit(1)\n')
+        status, output = self.lint()
+        # a refactor message
+        self.assertEqual(status, 8)
+        self.assertIn('sys-exit-used', output)
+
+
+class WarmCacheTest(DaemonTestCase):
+
+    def setUp(self):
+        super(WarmCacheTest, self).setUp()
+        self.write('"""Module"""\n')
+        self.warm_cache = daemon.WarmCache()
+        self.addCleanup(astroid.MANAGER.astroid_cache.pop, 'warm_module',
+                        None)
+
+    def build(self):
+        """Build the module as a run would; return the time it started"""
+        started = time.time_ns()
+        astroid.MANAGER.ast_from_file(self.module, 'warm_module')
+        return started
+
+    def test_unchanged_kept(self):
+        self.warm_cache.record(self.build())
+        self.assertEqual(self.warm_cache.invalidate(), set())
+        self.assertIn('warm_module', astroid.MANAGER.astroid_cache)
+
+    def test_modified_dropped(self):
+        self.warm_cache.record(self.build())
+        self.write('"""Edited module"""\n')
+        self.assertEqual(self.warm_cache.invalidate(), {self.module})
+        self.assertNotIn('warm_module', astroid.MANAGER.astroid_cache)
+
+    def test_modified_during_run_dropped(self):
+        # the tree may have been built from the previous version
+        started = self.build()
+        os.utime(self.module, ns=(started, started))
+        self.warm_cache.record(started)
+        self.assertNotIn('warm_module', astroid.MANAGER.astroid_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Tests of the parser of the docstrings checked by SphinxDocChecker"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import cnes_checker  # pylint: disable=wrong-import-position
+
+parse_docstring = cnes_checker.parse_docstring
+
+
+class ParseDocstringTest(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertIsNone(parse_docstring(None))
+        self.assertIsNone(parse_docstring(''))
+
+    def test_fields(self):
+        docstring = parse_docstring('Description\n\n:author: someone\n'
+                                    ':version:\n:date:2024\n')
+        self.assertEqual(docstring.fields,
+                         {'author': True, 'version': False, 'date': False})
+
+    def test_field_with_a_value_in_one_occurrence(self):
+        docstring = parse_docstring(':date:\n:date: 2024\n:version: 1.0\n'
+                                    ':version:')
+        self.assertEqual(docstring.fields, {'date': True, 'version': True})
+
+    def test_sphinx_fields_with_arguments(self):
+        docstring = parse_docstring('Description\n\n:param int value: a value'
+                                    '\n:returns: nothing\n')
+        self.assertEqual(docstring.fields, {'returns': True})
+
+    def test_description(self):
+        self.assertTrue(parse_docstring('Description').has_description)
+        self.assertTrue(parse_docstring('\n\n  Description\n  :author: a\n')
+                        .has_description)
+        self.assertFalse(parse_docstring(':returns: nothing').has_description)
+        self.assertFalse(parse_docstring('\n    :author: someone\n    ')
+                         .has_description)
+        self.assertFalse(parse_docstring('\n\n').has_description)
+
+    def test_memoized(self):
+        docstring = 'Description\n\n:author: someone\n'
+        self.assertIs(parse_docstring(docstring),
+                      parse_docstring(''.join(list(docstring))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests of the cache of the values inferred by the CNES checkers"""
+import operator
+import os
+import sys
+import textwrap
+import unittest
+from unittest import mock
+
+import astroid
+from astroid.exceptions import InferenceError
+from astroid.util import Uninferable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import cnes_checker  # pylint: disable=wrong-import-position
+
+SOURCE = textwrap.dedent('''\
+    import os
+
+    def func(arg):
+        return os.path, undefined, arg.attribute
+    ''')
+
+
+class InferenceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.module = astroid.parse(SOURCE, 'cached_module')
+        self.path, self.undefined, self.attribute = \
+            self.module.body[1].body[0].value.elts
+        self.cache = cnes_checker.InferenceCache()
+        self.cache.enter_module(self.module)
+
+    def infer(self, node):
+        """Return the values of `node` from the cache and the exception
+        ending them, counting the calls of `node.infer`
+        """
+        values = []
+        with mock.patch.object(type(node), 'infer', autospec=True,
+                               side_effect=type(node).infer) as infer:
+            try:
+                for value in self.cache.infer(node):
+                    values.append(value)
+            except InferenceError as exc:
+                return values, exc, infer.call_count
+        return values, None, infer.call_count
+
+    def test_hits_and_misses(self):
+        values, error, calls = self.infer(self.path)
+        self.assertEqual((error, calls), (None, 1))
+        self.assertEqual([value.name for value in values],
+                         [value.name for value in self.path.infer()])
+        cached, error, calls = self.infer(self.path)
+        self.assertEqual((error, calls), (None, 0))
+        self.assertEqual(len(cached), len(values))
+        self.assertTrue(all(map(operator.is_, cached, values)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_inference_error_cached(self):
+        _, error, calls = self.infer(self.undefined)
+        self.assertIsInstance(error, InferenceError)
+        self.assertEqual(calls, 1)
+        _, cached, calls = self.infer(self.undefined)
+        self.assertIs(cached, error)
+        self.assertEqual(calls, 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_uninferable_cached(self):
+        values, error, calls = self.infer(self.attribute)
+        self.assertEqual((values, error, calls), ([Uninferable], None, 1))
+        values, error, calls = self.infer(self.attribute)
+        self.assertEqual((values, error, calls), ([Uninferable], None, 0))
+
+    def test_dropped_when_last_user_leaves(self):
+        # two checkers use the cache
+        self.cache.enter_module(self.module)
+        self.infer(self.path)
+        self.cache.leave_module(self.module)
+        self.assertEqual(self.infer(self.path)[2], 0)
+        self.cache.leave_module(self.module)
+        self.cache.enter_module(self.module)
+        self.assertEqual(self.infer(self.path)[2], 1)
+
+    def test_reset_between_modules(self):
+        self.infer(self.path)
+        # the check of the module was interrupted before leaving it
+        other = astroid.parse(SOURCE, 'other_module')
+        self.cache.enter_module(other)
+        self.assertEqual(self.infer(self.path)[2], 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
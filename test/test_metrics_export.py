@@ -0,0 +1,79 @@
+"""Tests of the export of the per-function metrics to the metrics file"""
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import make_linter  # pylint: disable=wrong-import-position
+
+MODULE = textwrap.dedent('''\
+    """Module"""
+
+
+    def func(arg):
+        """Function"""
+        # a comment
+        if arg:
+            return 1
+        for item in arg:
+            while item:
+                item -= 1
+        return 2
+
+
+    class Klass:
+        """Class"""
+
+        def method(self):
+            """Method"""
+            return self
+    ''')
+
+
+class MetricsExportTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.module = os.path.join(directory.name, 'metrics_module.py')
+        with open(self.module, 'w', encoding='utf-8') as stream:
+            stream.write(MODULE)
+        self.metrics_file = os.path.join(directory.name, 'metrics.jsonl')
+
+    def export(self, messages=()):
+        """Lint the module with `messages` enabled, return the records of the
+        metrics file
+        """
+        linter = make_linter((), messages)
+        linter.set_option('metrics-file', self.metrics_file)
+        linter.check([self.module])
+        with open(self.metrics_file, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    def test_records(self):
+        records = self.export(('too-few-comments', 'too-high-complexity',
+                               'too-high-complexity-simplified'))
+        self.assertEqual(
+            records,
+            [{'path': self.module, 'module': 'metrics_module',
+              'function': 'metrics_module.func', 'line': 4, 'mccabe': 4,
+              'simplified_mccabe': 3, 'comment_ratio': 28.57},
+             {'path': self.module, 'module': 'metrics_module',
+              'function': 'metrics_module.Klass.method', 'line': 18,
+              'mccabe': 1, 'simplified_mccabe': 0, 'comment_ratio': 50.0}])
+
+    def test_records_without_messages(self):
+        # the metrics do not depend on the messages being enabled
+        expected = self.export(('too-few-comments', 'too-high-complexity',
+                                'too-high-complexity-simplified'))
+        os.remove(self.metrics_file)
+        self.assertEqual(self.export(('unused-import',)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
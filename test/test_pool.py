@@ -0,0 +1,48 @@
+"""Tests of the process-pool runner of cnes-lint"""
+import glob
+import os
+import sys
+import unittest
+
+from pylint.reporters import CollectingReporter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker.pool import PoolRun
+
+FILES = sorted(glob.glob(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), 'functional', '*.py')))
+
+
+def lint(*args):
+    """Return the messages of a cnes-lint run with `args` on `FILES`"""
+    reporter = CollectingReporter()
+    # the lines of duplicate-code differ with pylint -j as well
+    PoolRun(['--rcfile', os.devnull, '--load-plugins=cnes_checker',
+             '--reports=n', '--disable=duplicate-code', *args, *FILES],
+            reporter=reporter, exit=False)
+    return [(message.path, message.line, message.column, message.symbol,
+             message.msg) for message in reporter.messages]
+
+
+class PoolRunTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sequential = lint('-j1')
+
+    def test_same_messages_as_sequential_run(self):
+        self.assertTrue(self.sequential)
+        self.assertEqual(lint('-j2'), self.sequential)
+
+    def test_processes_replaced(self):
+        self.assertEqual(lint('-j2', '--max-files-per-process=1'),
+                         self.sequential)
+
+
+if __name__ == '__main__':
+    unittest.main()
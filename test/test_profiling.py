@@ -0,0 +1,123 @@
+"""Tests of the profiling of the callbacks of the CNES checkers"""
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from astroid import nodes
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import make_linter  # pylint: disable=wrong-import-position
+
+MODULE = textwrap.dedent('''\
+    """Module"""
+    import os
+
+
+    def func(arg):
+        """Function"""
+        if arg:
+            func(os.path.join(arg, arg))
+        return open(arg)
+    ''')
+
+
+class ProfilingTestCase(unittest.TestCase):
+    """Lints of modules of a temporary directory with the profiler"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.modules = []
+        for name in ('first_module', 'second_module'):
+            path = os.path.join(self.directory, f'{name}.py')
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write(MODULE)
+            self.modules.append(path)
+
+    def lint(self, **options):
+        """Lint the modules with `options`"""
+        linter = make_linter()
+        for name, value in options.items():
+            linter.set_option(name.replace('_', '-'), value)
+        linter.check(self.modules)
+        return linter
+
+
+class ProfileFileTest(ProfilingTestCase):
+
+    def test_infer_restored(self):
+        infer = nodes.NodeNG.infer
+        self.lint(profile_checkers=True)
+        self.assertIs(nodes.NodeNG.infer, infer)
+
+    def test_records(self):
+        path = os.path.join(self.directory, 'profile.jsonl')
+        self.lint(profile_file=path)
+        with open(path, encoding='utf-8') as stream:
+            records = [json.loads(line) for line in stream]
+        self.assertEqual([record['module'] for record in records],
+                         ['first_module', 'second_module'])
+        for record in records:
+            self.assertEqual(set(record), {'module', 'callbacks'})
+            self.assertIn('design.visit_call', record['callbacks'])
+            for calls, elapsed, inferences in record['callbacks'].values():
+                self.assertIsInstance(calls, int)
+                self.assertGreater(calls, 0)
+                self.assertIsInstance(elapsed, float)
+                self.assertGreaterEqual(elapsed, 0)
+                self.assertIsInstance(inferences, int)
+            self.assertGreater(sum(counts[2] for counts
+                                   in record['callbacks'].values()), 0)
+
+
+class TraceFileTest(ProfilingTestCase):
+
+    def trace(self, **options):
+        """Lint the modules with the trace `options`, return the trace"""
+        path = os.path.join(self.directory, 'trace.json')
+        self.lint(trace_file=path, **options)
+        with open(path, encoding='utf-8') as stream:
+            return json.load(stream)
+
+    def test_events(self):
+        trace = self.trace()
+        self.assertEqual(set(trace), {'traceEvents', 'displayTimeUnit'})
+        events = trace['traceEvents']
+        for event in events:
+            self.assertLessEqual({'name', 'cat', 'ph', 'ts', 'dur', 'pid',
+                                  'tid'}, set(event))
+            self.assertEqual(event['ph'], 'X')
+            self.assertIsInstance(event['ts'], float)
+            self.assertGreaterEqual(event['dur'], 0)
+            self.assertEqual((event['pid'], event['tid']), (os.getpid(), 0))
+        modules = [event for event in events if event['cat'] == 'module']
+        self.assertEqual([(event['name'], event['args']) for event in modules],
+                         [('first_module', {'path': self.modules[0]}),
+                          ('second_module', {'path': self.modules[1]})])
+        categories = {event['cat'] for event in events}
+        self.assertEqual(categories, {'module', 'callback', 'inference'})
+        # the callbacks given no node, as process_tokens, have no arguments
+        for event in events:
+            if event['cat'] == 'inference' or 'args' in event \
+                    and event['cat'] == 'callback':
+                self.assertEqual(set(event['args']), {'node', 'line'})
+        # the spans of a module lie within it
+        first = modules[0]
+        self.assertTrue(all(
+            first['ts'] <= event['ts'] <= first['ts'] + first['dur']
+            for event in events if event['ts'] < modules[1]['ts']))
+
+    def test_sample(self):
+        events = self.trace(trace_sample=2)['traceEvents']
+        self.assertEqual([event['name'] for event in events
+                          if event['cat'] == 'module'], ['first_module'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Tests of the on-disk cache of the messages of the CNES checkers"""
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import make_linter  # pylint: disable=wrong-import-position
+from cnes_checker import result_cache  # pylint: disable=wrong-import-position
+
+MODULE = textwrap.dedent('''\
+    """Module"""
+    import sys
+
+    import helper
+
+
+    def func(arg):
+        """Function"""
+        handle = open(arg)
+        if arg:
+            func(arg)
+        sys.exit(helper.VALUE)
+    ''')
+
+HELPER = textwrap.dedent('''\
+    """Helper"""
+    VALUE = 1
+    ''')
+
+
+class CacheTestCase(unittest.TestCase):
+    """Lints of a module of a temporary directory with the cache"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.module = self.write('cached_module.py', MODULE)
+        self.write('helper.py', HELPER)
+        sys.path.insert(0, self.directory)
+        self.addCleanup(sys.path.remove, self.directory)
+
+    def write(self, name, content):
+        """Write `content` to file `name` of the test directory"""
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        # the cache compares contents, not modification times
+        return path
+
+    def lint(self, **options):
+        """Lint the module with the cache, return the messages and the cache
+        """
+        linter = make_linter()
+        linter.set_option('result-cache-dir',
+                          os.path.join(self.directory, 'cache'))
+        for name, value in options.items():
+            linter.set_option(name.replace('_', '-'), value)
+        linter.check([self.module])
+        cache = next(checker.result_cache for checker in linter.get_checkers()
+                     if getattr(checker, 'result_cache', None) is not None)
+        messages = [(message.symbol, message.line, message.column,
+                     message.end_line, message.end_column, message.obj,
+                     message.msg) for message in linter.reporter.messages]
+        return messages, cache
+
+
+class ResultCacheTest(CacheTestCase):
+
+    def test_warm_run_replays_messages(self):
+        messages, cache = self.lint()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertIn('recursive-call', [message[0] for message in messages])
+        replayed, cache = self.lint()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(replayed, messages)
+
+    def test_edit_invalidates(self):
+        messages, _ = self.lint()
+        self.write('cached_module.py', MODULE.replace('        func(arg)\n',
+                                                      '        pass\n'))
+        edited, cache = self.lint()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertEqual([message for message in messages
+                          if message[0] != 'recursive-call'], edited)
+
+    def test_dependency_edit_invalidates(self):
+        self.lint()
+        self.write('helper.py', HELPER.replace('1', '2'))
+        _, cache = self.lint()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_options_invalidate(self):
+        self.lint()
+        _, cache = self.lint(max_decorators=1)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        _, cache = self.lint(max_decorators=1)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_plugin_version_invalidates(self):
+        self.lint()
+        with mock.patch.object(result_cache, '_plugin_version',
+                               return_value='another version'):
+            _, cache = self.lint()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Complexity-scaling tests of the CNES checkers
+
+The time spent in each checker must grow no faster than MAXIMUM_EXPONENTS
+allows with the number of functions of a module, the nesting depth of their
+blocks and the nesting depth of closures (see `benchmark/scaling.py`).
+
+As they take about a minute and measure times, which vary with the load of
+the machine, they only run when CNES_SCALING_TESTS is set::
+
+    CNES_SCALING_TESTS=1 python -m pytest test/test_scaling.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+from common import CHECKER_NAMES  # pylint: disable=wrong-import-position
+from scaling import DIMENSIONS, exponents  # pylint: disable=wrong-import-position
+
+# linear checkers fit about 1, quadratic ones about 2
+MAXIMUM_EXPONENTS = dict.fromkeys(CHECKER_NAMES, 1.5)
+
+
+@unittest.skipUnless(os.environ.get('CNES_SCALING_TESTS'),
+                     'set CNES_SCALING_TESTS to run the scaling tests')
+class ScalingTest(unittest.TestCase):
+
+    def test_scaling(self):
+        for dimension in DIMENSIONS:
+            for label, exponent in exponents(dimension).items():
+                with self.subTest(dimension=dimension, checker=label):
+                    self.assertLessEqual(
+                        exponent, MAXIMUM_EXPONENTS[label],
+                        f'{label} grows as the {exponent:.2f} power of the '
+                        f'{dimension}')
+
+
+if __name__ == '__main__':
+    unittest.main()
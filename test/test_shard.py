@@ -0,0 +1,86 @@
+"""Tests of the split of the files to lint into shards"""
+import glob
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from pylint.reporters import CollectingReporter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker import shard
+from cnes_checker.pool import PoolRun
+
+FILES = sorted(glob.glob(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), 'functional', '*.py')))
+
+
+def lint(*args):
+    """Return the messages of a cnes-lint run with `args`"""
+    reporter = CollectingReporter()
+    # the lines of duplicate-code differ with pylint -j as well
+    PoolRun(['--rcfile', os.devnull, '--load-plugins=cnes_checker',
+             '--reports=n', '--disable=duplicate-code', *args],
+            reporter=reporter, exit=False)
+    return [(message.path, message.line, message.column, message.symbol,
+             message.msg) for message in reporter.messages]
+
+
+class ShardTest(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertIsNone(shard.parse_shard(''))
+        self.assertEqual(shard.parse_shard('2/3'), (1, 3))
+        for value in ('0/3', '4/3', '1', 'a/b'):
+            with self.assertRaises(ValueError):
+                shard.parse_shard(value)
+
+    def test_split_balanced(self):
+        # loads of 8 and 7
+        self.assertEqual(shard.split([5, 1, 4, 2, 3], 2),
+                         [[0, 1, 3], [2, 4]])
+        self.assertEqual(shard.split([1], 3), [[0], [], []])
+
+
+class MergeTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.outputs = [os.path.join(directory.name, f'shard{index}.json')
+                        for index in range(1, 4)]
+        for index, output in enumerate(self.outputs, 1):
+            self.assertEqual(lint(f'--shard={index}/3',
+                                  f'--shard-output={output}', *FILES), [])
+
+    def test_merged_as_unsharded(self):
+        merged = lint('--merge-shards=y', *self.outputs)
+        self.assertTrue(merged)
+        self.assertEqual(merged, lint(*FILES))
+
+    def test_missing_shard(self):
+        with self.assertRaises(ValueError):
+            shard.load_results(self.outputs[1:])
+
+    def test_invalid_results(self):
+        with open(self.outputs[0], encoding='utf-8') as stream:
+            content = json.load(stream)
+        content['results'][0]['messages'].append({'msg_id': 'W1234'})
+        with open(self.outputs[0], 'w', encoding='utf-8') as stream:
+            json.dump(content, stream)
+        with self.assertRaises(ValueError):
+            shard.load_results(self.outputs)
+        with open(self.outputs[0], 'w', encoding='utf-8') as stream:
+            json.dump([], stream)
+        with self.assertRaises(ValueError):
+            shard.load_results(self.outputs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests of the snapshots of the astroid trees"""
+import glob
+import os
+import sys
+import tempfile
+import unittest
+
+import astroid
+from pylint.reporters import CollectingReporter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker import snapshots
+from cnes_checker.pool import PoolRun
+
+FILES = sorted(glob.glob(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), 'functional', '*.py')))
+
+
+def lint(*args):
+    """Return the messages of a cnes-lint run with `args` on `FILES`, the
+    modules being built again
+    """
+    astroid.MANAGER.clear_cache()
+    reporter = CollectingReporter()
+    # which of the similar files duplicate-code quotes depends on the order
+    # the modules were built in, as with pylint -j
+    PoolRun(['--rcfile', os.devnull, '--load-plugins=cnes_checker',
+             '--reports=n', '--disable=duplicate-code', *args, *FILES],
+            reporter=reporter, exit=False)
+    return [(message.path, message.line, message.column, message.symbol,
+             message.msg) for message in reporter.messages]
+
+
+class SnapshotRunTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.addCleanup(snapshots.configure, '')
+        self.addCleanup(astroid.MANAGER.clear_cache)
+
+    def test_same_messages_as_normal_run(self):
+        expected = lint()
+        self.assertTrue(expected)
+        option = f'--snapshot-dir={self.directory}'
+        self.assertEqual(lint(option), expected)
+        self.assertEqual(snapshots.configure(self.directory).hits, 0)
+        self.assertTrue(os.listdir(self.directory))
+        self.assertEqual(lint(option), expected)
+        store = snapshots.configure(self.directory)
+        self.assertGreaterEqual(store.hits, len(FILES))
+
+
+if __name__ == '__main__':
+    unittest.main()
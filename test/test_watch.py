@@ -0,0 +1,133 @@
+"""Tests of the watch mode of cnes-lint"""
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmark'))
+
+# common puts the plugin on the path
+# pylint: disable=wrong-import-position,unused-import
+import common
+from cnes_checker import watch
+
+ARGS = ['--rcfile', os.devnull, '--reports=n', '--disable=all',
+        '--enable=sys-exit-used']
+
+EXIT = '"""Module"""\nimport sys\nsys.exit(1)\n'
+
+SOURCES = {
+    'watched_base.py': EXIT,
+    'watched_middle.py': '"""Module"""\nimport watched_base\n',
+    'watched_top.py': '"""Module"""\nimport watched_middle\n',
+    'watched_other.py': '"""Module"""\nimport os\n',
+}
+
+
+class Stop(Exception):
+    """Ends the watch once the changes are exhausted"""
+
+
+class FakeWatcher(object):
+    """Watcher making the changes of `edits` one at a time"""
+
+    def __init__(self, edits):
+        self.edits = list(edits)
+
+    def wait(self):
+        if not self.edits:
+            raise Stop()
+        return self.edits.pop(0)()
+
+
+class WatchTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name, source in SOURCES.items():
+            self.write(name, source)
+        self.output = io.StringIO()
+        self.watch = watch.Watch(self.root, ARGS, self.output)
+
+    def path(self, name):
+        """Return the path of file `name` of the tree"""
+        return os.path.join(self.root, name)
+
+    def write(self, name, source):
+        """Write `source` to file `name`, dated a second after its previous
+        version, from a minute ago; return the changed files
+        """
+        path = self.path(name)
+        mtime = os.stat(path).st_mtime_ns \
+            if os.path.exists(path) else time.time_ns() - 60 * 10**9
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(source)
+        os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+        return {path}
+
+    def remove(self, name):
+        """Remove file `name`; return the changed files"""
+        os.remove(self.path(name))
+        return {self.path(name)}
+
+    def line(self, sign, name, line):
+        """Return the output line of the sys-exit-used message of `name`"""
+        return (f'{sign} {os.path.relpath(self.path(name))}:{line}:0: '
+                f'R5401: Consider dropping use of sys.exit() (sys-exit-used)')
+
+    def run_watch(self, *edits):
+        """Run the watch through `edits`; return the lines of each lint"""
+        lints = []
+
+        def edit(change):
+            def changed():
+                lints.append(self.pop_output())
+                return change()
+            return changed
+
+        with self.assertRaises(Stop):
+            self.watch.run(lambda root: FakeWatcher(map(edit, edits)))
+        lints.append(self.pop_output())
+        return lints
+
+    def pop_output(self):
+        """Return the lines output since the last call"""
+        lines = self.output.getvalue().splitlines()
+        self.output.seek(0)
+        self.output.truncate()
+        return lines
+
+    def test_differences(self):
+        lints = self.run_watch(
+            lambda: self.write('watched_base.py', '"""Module"""\n'),
+            lambda: self.write('watched_new.py', EXIT),
+            lambda: self.write('watched_other.py', '"""Module"""\n'),
+            lambda: self.remove('watched_new.py'))
+        self.assertEqual(lints, [
+            [self.line('+', 'watched_base.py', 3)],
+            [self.line('-', 'watched_base.py', 3)],
+            [self.line('+', 'watched_new.py', 3)],
+            # nothing changed
+            [],
+            [self.line('-', 'watched_new.py', 3)],
+        ])
+
+    def test_affected_importers(self):
+        files = watch.source_files(self.root)
+        self.assertEqual(self.watch.affected(files), files)
+        # the importers of the importers as well
+        self.assertEqual(self.watch.affected({self.path('watched_base.py')}),
+                         {self.path(name) for name in (
+                             'watched_base.py', 'watched_middle.py',
+                             'watched_top.py')})
+        self.assertEqual(self.watch.affected({self.path('watched_top.py')}),
+                         {self.path('watched_top.py')})
+
+
+if __name__ == '__main__':
+    unittest.main()